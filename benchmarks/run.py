@@ -0,0 +1,143 @@
+"""
+    Benchmark of the solver over the built-in boards and an optional corpus file.
+
+    Run with: python -m benchmarks.run --repeat 20 --output bench.json --baseline baseline.json
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import sys
+from timeit import default_timer as timer
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from src.boards import difficulty, technique
+from src.loader import load_puzzles
+from src.profiling import percentiles
+from src.sudoku import Sudoku
+
+PERCENTILES = (50, 90, 99)
+
+
+def board_factories() -> List[Tuple[str, Callable[[], Sudoku]]]:
+    factories = []
+    for module in (difficulty, technique):
+        for name, f in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('sudoku_') and f.__module__ == module.__name__:
+                factories.append((name, f))
+    return factories
+
+
+def summarize(times: List[float], solved: int) -> Dict[str, float]:
+    times = sorted(times)
+    total = sum(times)
+    summary = percentiles(times, PERCENTILES)
+    summary['mean'] = total / len(times)
+    summary['min'] = times[0]
+    summary['max'] = times[-1]
+    summary['runs'] = len(times)
+    summary['solved'] = solved
+    summary['puzzles_per_second'] = len(times) / total if total else 0.0
+    return summary
+
+
+def time_solves(puzzles: List[List[int]], repeat: int, fallback: str = None) -> Tuple[List[float], int]:
+    times = []
+    solved = 0
+    for _ in range(repeat):
+        for cells in puzzles:
+            sudoku = Sudoku(list(cells))
+            start = timer()
+            sudoku.solve(fallback)
+            times.append(timer() - start)
+            solved += sudoku.solved
+    return times, solved
+
+
+def run(repeat: int = 10, corpus: str = None, fallback: str = None) -> Dict:
+    results = {}
+    all_times = []
+    all_solved = 0
+    for name, factory in board_factories():
+        times, solved = time_solves([factory().cells], repeat, fallback)
+        results[name] = summarize(times, solved)
+        all_times += times
+        all_solved += solved
+
+    if corpus is not None:
+        times, solved = time_solves(list(load_puzzles(corpus)), repeat, fallback)
+        if times:
+            results[f'corpus:{corpus}'] = summarize(times, solved)
+            all_times += times
+            all_solved += solved
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'fallback': fallback,
+        },
+        'boards': results,
+        'aggregate': summarize(all_times, all_solved),
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = 0.1) -> List[str]:
+    '''
+        Names of the boards (and "aggregate") whose median time is slower than the baseline by more than threshold.
+    '''
+    regressions = []
+    entries = dict(report['boards'], aggregate=report['aggregate'])
+    baseline_entries = dict(baseline['boards'], aggregate=baseline['aggregate'])
+    for name, summary in entries.items():
+        base = baseline_entries.get(name)
+        if base is not None and summary['p50'] > base['p50'] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def display(report: Dict, baseline: Dict = None, regressions: Sequence[str] = ()):
+    entries = dict(report['boards'], aggregate=report['aggregate'])
+    baseline_entries = dict(baseline['boards'], aggregate=baseline['aggregate']) if baseline else {}
+    print(f"{'board':<40} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'per sec':>9} {'vs base':>8}")
+    for name, summary in entries.items():
+        base = baseline_entries.get(name)
+        change = f"{summary['p50'] / base['p50'] - 1:+.1%}" if base and base['p50'] else ''
+        flag = ' !' if name in regressions else ''
+        print(f"{name:<40} {summary['p50'] * 1000:9.3f} {summary['p90'] * 1000:9.3f} {summary['p99'] * 1000:9.3f} "
+              f"{summary['puzzles_per_second']:9.1f} {change:>8}{flag}")
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the Sudoku solver.')
+    parser.add_argument('--repeat', type=int, default=10, help='number of solves of each puzzle')
+    parser.add_argument('--corpus', help='file of extra puzzles to solve')
+    parser.add_argument('--fallback', choices=['dlx'], help='search fallback of Sudoku.solve')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown of the median flagged as a regression')
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat, args.corpus, args.fallback)
+    baseline = None
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        report['regressions'] = regressions
+
+    display(report, baseline, regressions)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+    Microbenchmark of the precomputed topology tables against building index lists on every call.
+
+    Run with: python -m benchmarks.topology
+"""
+
+from timeit import timeit
+from typing import List
+
+from src.topology import *
+
+
+def row_indices(r: int) -> List[int]:
+    return [r * 9 + i for i in range(9)]
+
+
+def column_indices(c: int) -> List[int]:
+    return [i * 9 + c for i in range(9)]
+
+
+def box_indices(b: int) -> List[int]:
+    r_start = b // 3 * 3
+    c_start = b % 3 * 3
+    return [r * 9 + c for r in range(r_start, r_start + 3) for c in range(c_start, c_start + 3)]
+
+
+def mini_row_indices(r: int, b: int) -> List[int]:
+    c_start = b % 3 * 3
+    return row_indices(b // 3 * 3 + r)[c_start:c_start + 3]
+
+
+def position(i: int):
+    r = i // 9
+    c = i % 9
+    return r, c, r // 3 * 3 + c // 3
+
+
+def computed():
+    for k in range(9):
+        row_indices(k)
+        column_indices(k)
+        box_indices(k)
+        for x in range(3):
+            mini_row_indices(x, k)
+    for i in range(81):
+        position(i)
+
+
+def precomputed():
+    for k in range(9):
+        ROWS[k]
+        COLUMNS[k]
+        BOXES[k]
+        for x in range(3):
+            MINI_ROWS[k][x]
+    for i in range(81):
+        POSITIONS[i]
+
+
+def main(number: int = 20000):
+    computed_time = timeit(computed, number=number)
+    precomputed_time = timeit(precomputed, number=number)
+    print(f"computed:    {computed_time:.4f} seconds")
+    print(f"precomputed: {precomputed_time:.4f} seconds")
+    print(f"speedup:     {computed_time / precomputed_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
-from src.boards import *
+import sys
+
+from src.cli import main
 
 if __name__ == '__main__':
-    sudoku_evil().solve_and_display().display_candidates()
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+    Batch solving of many puzzles with a single solver state.
+"""
+
+from timeit import default_timer as timer
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
+from src.profiling import TechniqueStats
+from src.scheduler import Scheduler
+from src.sudoku import Sudoku
+from src.util import Puzzle, cells_to_string, parse_cells
+
+
+class SolveResult(NamedTuple):
+    solution: str
+    solved: bool
+    cells_solved: int
+    elapsed: float
+    techniques: Dict[str, int]
+
+
+def solve_cells(sudoku: Sudoku, cells: List[int], fallback: str = None) -> SolveResult:
+    '''
+        Load cells into an existing Sudoku and solve it.
+    '''
+    sudoku.reset(cells)
+    start = timer()
+    cells_solved = sudoku.solve(fallback)
+    elapsed = timer() - start
+    return SolveResult(cells_to_string(sudoku.cells), sudoku.solved, cells_solved, elapsed, sudoku.techniques_used)
+
+
+def solve_many(puzzles: Iterable[Puzzle], scheduler: Scheduler = None, fallback: str = None,
+               stats: TechniqueStats = None) -> Iterator[SolveResult]:
+    '''
+        Solve puzzles of 81 digits one by one, yielding a result for each. The same Sudoku is reused for every puzzle.
+        If stats is given, the technique calls of all puzzles are recorded in it.
+    '''
+    sudoku = Sudoku()
+    sudoku.stats = stats
+    if scheduler is not None:
+        sudoku.scheduler = scheduler
+    for puzzle in puzzles:
+        yield solve_cells(sudoku, parse_cells(puzzle), fallback)
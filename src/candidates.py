@@ -0,0 +1,206 @@
+"""
+    Bitmask helpers and the candidate store of a Sudoku.
+
+    The candidates of a cell are packed into a 9-bit mask, where bit d - 1 is set if digit d is a candidate.
+"""
+
+from array import array
+from typing import (Any, Callable, Dict, FrozenSet, Hashable, Iterable,
+                    Iterator, List, NamedTuple, Tuple)
+
+from src.topology import CELL_UNITS, Cells
+
+ALL_CANDIDATES = 0x1FF
+
+DIGIT_MASKS: Tuple[int, ...] = (0,) + tuple(1 << (d - 1) for d in range(1, 10))
+
+MASK_DIGITS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(d for d in range(1, 10) if m & (1 << (d - 1))) for m in range(512))
+
+MASK_SETS: Tuple[FrozenSet[int], ...] = tuple(frozenset(digits) for digits in MASK_DIGITS)
+
+POPCOUNT: Tuple[int, ...] = tuple(len(digits) for digits in MASK_DIGITS)
+
+LOWEST_DIGIT: Tuple[int, ...] = tuple(digits[0] if digits else 0 for digits in MASK_DIGITS)
+
+
+class Elimination(NamedTuple):
+    """
+        Candidates a technique found it can remove: the digits of mask from cells, because of the cells in reasons.
+    """
+    cells: Cells
+    mask: int
+    reasons: Cells
+
+
+def digit_mask(d: int) -> int:
+    return DIGIT_MASKS[d]
+
+
+def digits_mask(digits: Iterable[int]) -> int:
+    mask = 0
+    for d in digits:
+        mask |= DIGIT_MASKS[d]
+    return mask
+
+
+def mask_digits(mask: int) -> Tuple[int, ...]:
+    return MASK_DIGITS[mask]
+
+
+def popcount(mask: int) -> int:
+    return POPCOUNT[mask]
+
+
+def lowest_digit(mask: int) -> int:
+    return LOWEST_DIGIT[mask]
+
+
+class Candidates:
+    """
+        Candidate store of a Sudoku, holding one 9-bit mask per cell in a flat array.
+        Indexing returns a read-only set view of the candidates of a cell.
+
+        Every change to a cell bumps the version counter of its row, column and box,
+        so techniques can skip the units that did not change since their last run.
+
+        After a checkpoint, every change is recorded in a trail of (cell, previous mask) entries,
+        so rollback restores the masks in time proportional to the changes made since.
+    """
+    __slots__ = ('masks', 'versions', 'seen', 'trail', 'cache')
+
+    def __init__(self):
+        self.masks = array('H', [0]) * 81
+        self.versions: List[int] = [0] * 27
+        self.seen: Dict[Hashable, List[int]] = {}
+        self.trail: List[int] = None
+        self.cache: Dict[Hashable, Tuple[List[int], Any]] = {}
+
+    def __len__(self) -> int:
+        return 81
+
+    def __getitem__(self, i: int) -> FrozenSet[int]:
+        return MASK_SETS[self.masks[i]]
+
+    def __iter__(self) -> Iterator[FrozenSet[int]]:
+        return (MASK_SETS[m] for m in self.masks)
+
+    def clear(self):
+        self.save_all()
+        for i in range(81):
+            self.masks[i] = 0
+        self.touch_all()
+
+    def set_mask(self, i: int, mask: int):
+        if self.trail is not None:
+            self.trail.append(i << 9 | self.masks[i])
+        self.masks[i] = mask
+        self.touch(i)
+
+    def save_all(self):
+        """
+            Record every mask in the trail, before overwriting the masks directly.
+        """
+        if self.trail is not None:
+            self.trail.extend(i << 9 | mask for i, mask in enumerate(self.masks))
+
+    def checkpoint(self) -> int:
+        """
+            Start recording changes, if not already, and return the current position of the trail.
+        """
+        if self.trail is None:
+            self.trail = []
+        return len(self.trail)
+
+    def rollback(self, checkpoint: int):
+        """
+            Undo the changes made since a checkpoint.
+        """
+        trail = self.trail
+        if trail is None or checkpoint > len(trail):
+            raise ValueError(f'Invalid checkpoint: {checkpoint}')
+        masks = self.masks
+        while len(trail) > checkpoint:
+            entry = trail.pop()
+            i = entry >> 9
+            masks[i] = entry & ALL_CANDIDATES
+            self.touch(i)
+        self.forget_changes()
+
+    def forget_changes(self):
+        """
+            Mark every unit as changed for all the techniques. Techniques skip units on the assumption that candidates
+            only shrink, so this is needed after candidates are added back.
+        """
+        self.seen.clear()
+
+    def release(self):
+        """
+            Stop recording changes. The checkpoints taken before can no longer be rolled back.
+        """
+        self.trail = None
+
+    def touch(self, i: int):
+        versions = self.versions
+        r, c, b = CELL_UNITS[i]
+        versions[r] += 1
+        versions[c] += 1
+        versions[b] += 1
+
+    def touch_all(self):
+        versions = self.versions
+        for u in range(27):
+            versions[u] += 1
+
+    def changed_units(self, key: Hashable) -> List[bool]:
+        """
+            Flags of the units changed since the last call with the same key, indexed by unit.
+        """
+        versions = self.versions
+        seen = self.seen.get(key)
+        self.seen[key] = versions[:]
+        if seen is None:
+            return [True] * 27
+        return [v != s for v, s in zip(versions, seen)]
+
+    def cached(self, key: Hashable, build: Callable[[array], Any]) -> Any:
+        """
+            Index built from the masks by build, built again only if a cell changed since the last call with the same key.
+        """
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] == self.versions:
+            return entry[1]
+        value = build(self.masks)
+        self.cache[key] = (self.versions[:], value)
+        return value
+
+    def union(self, indices: Iterable[int]) -> int:
+        masks = self.masks
+        mask = 0
+        for i in indices:
+            mask |= masks[i]
+        return mask
+
+    def count(self) -> int:
+        return sum(POPCOUNT[m] for m in self.masks)
+
+    def eliminate(self, indices: Iterable[int], mask: int) -> int:
+        """
+            Remove the digits of mask from the candidates of the cells. Return the number of candidates removed.
+        """
+        masks = self.masks
+        versions = self.versions
+        trail = self.trail
+        cnt = 0
+        for i in indices:
+            removed = masks[i] & mask
+            if removed:
+                if trail is not None:
+                    trail.append(i << 9 | masks[i])
+                masks[i] ^= removed
+                cnt += POPCOUNT[removed]
+                r, c, b = CELL_UNITS[i]
+                versions[r] += 1
+                versions[c] += 1
+                versions[b] += 1
+        return cnt
@@ -0,0 +1,158 @@
+"""
+    Canonical form of a grid under the Sudoku symmetries, and a solution cache keyed on it.
+
+    The symmetries are relabeling digits, permuting rows inside bands, bands, columns inside stacks and stacks, and transposing.
+    Rows and bands (columns and stacks) are ordered by invariants of those symmetries, every ordering of tied lines is tried,
+    and the smallest grid after relabeling digits in order of first appearance is the canonical form.
+    Grids of the same class get the same canonical form, unless they have more tied orderings than max_candidates.
+"""
+
+from collections import OrderedDict
+from itertools import permutations, product
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.sudoku import Sudoku
+from src.util import Puzzle, parse_cells
+
+MAX_CANDIDATES = 5000
+
+TRANSPOSE = tuple(c * 9 + r for r in range(9) for c in range(9))
+
+
+class Transform(NamedTuple):
+    cells: Tuple[int, ...]
+    digits: Tuple[int, ...]
+
+    def apply(self, grid: Sequence[int]) -> List[int]:
+        '''
+            Map a grid (a puzzle or its solution) to the canonical space.
+        '''
+        digits = self.digits
+        return [digits[grid[i]] for i in self.cells]
+
+    def invert(self, grid: Sequence[int]) -> List[int]:
+        '''
+            Map a grid of the canonical space back.
+        '''
+        inverse = [0] * 10
+        for d, canonical_d in enumerate(self.digits):
+            inverse[canonical_d] = d
+        original = [0] * 81
+        for k, i in enumerate(self.cells):
+            original[i] = inverse[grid[k]]
+        return original
+
+
+def line_orders(keys: Sequence[tuple]) -> List[Tuple[int, ...]]:
+    '''
+        Orderings of 9 lines, grouped 3 by 3 in blocks, sorting blocks and lines inside blocks by key and trying every order of ties.
+    '''
+    def tied_orders(items: Sequence[int], key) -> List[Tuple[int, ...]]:
+        groups = []
+        for item in sorted(items, key=key):
+            if groups and key(groups[-1][0]) == key(item):
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        return [sum(orders, ()) for orders in product(*(list(permutations(group)) for group in groups))]
+
+    def block_key(block: int) -> tuple:
+        return tuple(sorted(keys[block * 3 + k] for k in range(3)))
+
+    inner = [tied_orders(range(block * 3, block * 3 + 3), lambda line: keys[line]) for block in range(3)]
+    orders = []
+    for blocks in tied_orders(range(3), block_key):
+        for lines in product(*(inner[block] for block in blocks)):
+            orders.append(sum(lines, ()))
+    return orders
+
+
+def oriented_orders(grid: Sequence[int]) -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    '''
+        Candidate row and column orders of a grid, using the number of givens of each line and of the lines crossing its givens.
+    '''
+    row_counts = [sum(1 for c in range(9) if grid[r * 9 + c]) for r in range(9)]
+    column_counts = [sum(1 for r in range(9) if grid[r * 9 + c]) for c in range(9)]
+    row_keys = [(row_counts[r], sorted(column_counts[c] for c in range(9) if grid[r * 9 + c])) for r in range(9)]
+    column_keys = [(column_counts[c], sorted(row_counts[r] for r in range(9) if grid[r * 9 + c])) for c in range(9)]
+    return line_orders(row_keys), line_orders(column_keys)
+
+
+def canonicalize(puzzle: Puzzle, max_candidates: int = MAX_CANDIDATES) -> Tuple[Tuple[int, ...], Transform]:
+    '''
+        Canonical form of a grid, and the transform mapping the grid to it.
+    '''
+    cells = parse_cells(puzzle)
+    best = None
+    best_transform = None
+    for transposed in (False, True):
+        grid = [cells[i] for i in TRANSPOSE] if transposed else cells
+        row_orders, column_orders = oriented_orders(grid)
+        if len(row_orders) * len(column_orders) > max_candidates:
+            # Too many ties: keep the first orders, which is still a valid (but not canonical) form
+            row_orders = row_orders[:1]
+            column_orders = column_orders[:1]
+        for rows in row_orders:
+            for columns in column_orders:
+                indices = [r * 9 + c for r in rows for c in columns]
+                digits = [0] * 10
+                label = 0
+                form = []
+                for k in indices:
+                    d = grid[k]
+                    if d and not digits[d]:
+                        label += 1
+                        digits[d] = label
+                    form.append(digits[d])
+                if best is not None and form >= best:
+                    continue
+                for d in range(1, 10):
+                    # Digits missing from the grid take the remaining labels
+                    if not digits[d]:
+                        label += 1
+                        digits[d] = label
+                best = form
+                source = [TRANSPOSE[k] for k in indices] if transposed else indices
+                best_transform = Transform(tuple(source), tuple(digits))
+    return tuple(best), best_transform
+
+
+class SolutionCache:
+    """
+        Bounded LRU cache of solutions keyed on the canonical form of puzzles.
+        Puzzles of the same symmetry class share one entry, and only solved puzzles are stored.
+    """
+
+    def __init__(self, maxsize: int = 4096, fallback: str = 'dlx'):
+        self.maxsize = maxsize
+        self.fallback = fallback
+        self.entries: OrderedDict[Tuple[int, ...], bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def solve(self, puzzle: Puzzle) -> Optional[List[int]]:
+        '''
+            Solution of a puzzle, looked up in the cache or solved and stored. Return None if the puzzle could not be solved.
+        '''
+        form, transform = canonicalize(puzzle)
+        solution = self.entries.get(form)
+        if solution is not None:
+            self.hits += 1
+            self.entries.move_to_end(form)
+            return transform.invert(solution)
+
+        self.misses += 1
+        sudoku = Sudoku(parse_cells(puzzle))
+        sudoku.solve(self.fallback)
+        if not sudoku.solved:
+            return None
+        self.entries[form] = bytes(transform.apply(sudoku.cells))
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return sudoku.cells
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
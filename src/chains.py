@@ -0,0 +1,203 @@
+"""
+    Chains over a graph of strong and weak links between candidates: simple coloring, X-chains, XY-chains and AIC.
+
+    A candidate (cell i, digit d) is a node numbered (d - 1) * 81 + i, so a set of nodes is a board of 729 bits
+    made of one 81-bit board of cells per digit. Two candidates are strongly linked if one of them is true when the other
+    is false: the two places of a digit in a unit (a conjugate pair), or the two digits of a bivalue cell. They are weakly
+    linked if they cannot both be true: the same digit in two peers, or two digits of a cell.
+
+    A chain alternates strong and weak links, starting and ending with a strong link: if its first candidate is false
+    its last one is true, so any candidate weakly linked to both ends is false. The nodes implied true by a false start are
+    found breadth first over the boards, so each start costs about the number of nodes it reaches.
+"""
+
+from typing import Dict, List, NamedTuple, Sequence
+
+from src.candidates import DIGIT_MASKS, MASK_DIGITS, Elimination
+from src.topology import PEERS
+from src.wings import Links
+
+MAX_CHAIN_LENGTH = 12
+
+CELL_BOARD = (1 << 81) - 1
+PEER_BOARDS = tuple(sum(1 << j for j in PEERS[i]) for i in range(81))
+# Board of the nodes of each digit, indexed by node // 81
+DIGIT_BOARDS = tuple(CELL_BOARD << (k * 81) for k in range(9))
+
+
+class LinkGraph(NamedTuple):
+    weak: List[int]
+    conjugate: Dict[int, int]
+    bivalue: Dict[int, int]
+    strong: Dict[int, int]
+
+
+def node_of(i: int, d: int) -> int:
+    return (d - 1) * 81 + i
+
+
+def cell_boards(masks: Sequence[int]) -> List[int]:
+    '''
+        Board of the cells where each digit is a candidate.
+    '''
+    boards = [0] * 10
+    for i in range(81):
+        for d in MASK_DIGITS[masks[i]]:
+            boards[d] |= 1 << i
+    return boards
+
+
+def link_graph(masks: Sequence[int], links: Links) -> LinkGraph:
+    '''
+        Weak links of every candidate, and strong links from the conjugate pairs of links and from the bivalue cells.
+    '''
+    boards = cell_boards(masks)
+    weak = [0] * 729
+    bivalue = {}
+    for i in range(81):
+        digits = MASK_DIGITS[masks[i]]
+        if not digits:
+            continue
+        in_cell = 0
+        for d in digits:
+            in_cell |= 1 << node_of(i, d)
+        for d in digits:
+            node = node_of(i, d)
+            weak[node] = (PEER_BOARDS[i] & boards[d]) << ((d - 1) * 81) | in_cell & ~(1 << node)
+        if len(digits) == 2:
+            a = node_of(i, digits[0])
+            b = node_of(i, digits[1])
+            bivalue[a] = 1 << b
+            bivalue[b] = 1 << a
+
+    conjugate = {}
+    for d in range(1, 10):
+        for e1, e2 in links[d]:
+            a = node_of(e1, d)
+            b = node_of(e2, d)
+            conjugate[a] = conjugate.get(a, 0) | 1 << b
+            conjugate[b] = conjugate.get(b, 0) | 1 << a
+
+    strong = dict(conjugate)
+    for node, board in bivalue.items():
+        strong[node] = strong.get(node, 0) | board
+    return LinkGraph(weak, conjugate, bivalue, strong)
+
+
+def implications(weak: List[int], strong: Dict[int, int], start: int, max_length: int = MAX_CHAIN_LENGTH,
+                 same_digit: bool = False):
+    '''
+        Boards of the nodes implied true and false when the start node is false, through chains of at most max_length links.
+        With same_digit, weak links only join candidates of the same digit.
+    '''
+    on = frontier = strong.get(start, 0)
+    off = 1 << start
+    length = 1
+    while frontier and length + 2 <= max_length:
+        reached = 0
+        while frontier:
+            low = frontier & -frontier
+            node = low.bit_length() - 1
+            if same_digit:
+                reached |= weak[node] & DIGIT_BOARDS[node // 81]
+            else:
+                reached |= weak[node]
+            frontier ^= low
+        reached &= ~off
+        off |= reached
+        while reached:
+            low = reached & -reached
+            frontier |= strong.get(low.bit_length() - 1, 0)
+            reached ^= low
+        frontier &= ~on
+        on |= frontier
+        length += 2
+    return on, off
+
+
+def board_eliminations(board: int, reasons: Sequence[int]) -> List[Elimination]:
+    '''
+        Eliminations removing the nodes of a board, one per digit.
+    '''
+    eliminations = []
+    for k in range(9):
+        cells = board >> (k * 81) & CELL_BOARD
+        if cells:
+            targets = tuple(i for i in range(81) if cells >> i & 1)
+            eliminations.append(Elimination(targets, DIGIT_MASKS[k + 1], tuple(reasons)))
+    return eliminations
+
+
+def find_chains(graph: LinkGraph, strong: Dict[int, int], max_length: int = MAX_CHAIN_LENGTH,
+                same_digit: bool = False) -> List[Elimination]:
+    '''
+        Eliminations of the chains whose strong links are in strong, starting from each node with a strong link.
+        A false start implying a node both true and false is a contradiction, so the start is true.
+    '''
+    weak = graph.weak
+    removed = 0
+    eliminations = []
+    for start in sorted(strong):
+        on, off = implications(weak, strong, start, max_length, same_digit)
+        if on & off:
+            targets = weak[start] & ~removed
+            if targets:
+                removed |= targets
+                eliminations.extend(board_eliminations(targets, (start % 81,)))
+            continue
+        # A chain read backwards is a chain from its end, so each pair of ends is checked once
+        ends = on >> start << start
+        while ends:
+            low = ends & -ends
+            end = low.bit_length() - 1
+            targets = weak[start] & weak[end] & ~removed
+            if targets:
+                removed |= targets
+                eliminations.extend(board_eliminations(targets, (start % 81, end % 81)))
+            ends ^= low
+    return eliminations
+
+
+def find_coloring(masks: Sequence[int], links: Links) -> List[Elimination]:
+    '''
+        Color the cells of each cluster of conjugate pairs of a digit with two alternating colors: one color is the digit.
+        A color with two cells seeing each other is false, and a cell seeing both colors cannot be the digit.
+    '''
+    boards = cell_boards(masks)
+    eliminations = []
+    for d in range(1, 10):
+        neighbours = {}
+        for e1, e2 in links[d]:
+            neighbours.setdefault(e1, []).append(e2)
+            neighbours.setdefault(e2, []).append(e1)
+        colored = set()
+        for first in neighbours:
+            if first in colored:
+                continue
+            colors = [0, 0]
+            stack = [(first, 0)]
+            colored.add(first)
+            while stack:
+                i, color = stack.pop()
+                colors[color] |= 1 << i
+                for j in neighbours[i]:
+                    if j not in colored:
+                        colored.add(j)
+                        stack.append((j, 1 - color))
+            cluster = colors[0] | colors[1]
+            seen = [0, 0]
+            for color in (0, 1):
+                board = colors[color]
+                while board:
+                    low = board & -board
+                    seen[color] |= PEER_BOARDS[low.bit_length() - 1]
+                    board ^= low
+            reasons = tuple(i for i in range(81) if cluster >> i & 1)
+            wrapped = [colors[color] & seen[color] for color in (0, 1)]
+            if wrapped[0] or wrapped[1]:
+                targets = colors[0] if wrapped[0] else colors[1]
+            else:
+                targets = seen[0] & seen[1] & boards[d] & ~cluster
+            if targets:
+                eliminations.append(Elimination(tuple(i for i in range(81) if targets >> i & 1), DIGIT_MASKS[d], reasons))
+    return eliminations
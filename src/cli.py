@@ -0,0 +1,223 @@
+"""
+    Command line entry point: solve the puzzles of files or stdin, and write their solutions.
+
+        python main.py puzzles.txt --jobs 8 --format jsonl --fallback dlx --profile > solutions.jsonl
+
+    Puzzles are read as one line of 81 cells or as 9 lines of 9 cells, or from binary databases (src.database) ending in .sudb.
+    Solutions go to stdout (or --output) in input order, and a throughput and latency summary goes to stderr.
+    Without arguments on a terminal, the demo board is solved.
+    Modules are imported by the mode that needs them, so starting the command stays cheap.
+"""
+
+import argparse
+import sys
+from collections import deque
+from timeit import default_timer as timer
+from typing import Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+FORMATS = ('line', 'jsonl', 'csv')
+DATABASE_SUFFIX = '.sudb'
+CSV_HEADER = ('source', 'line', 'puzzle', 'solution', 'solved', 'cells_solved', 'elapsed_ms')
+# Results written at once, so the output costs one write per batch instead of one per puzzle
+WRITE_BATCH = 256
+
+
+def parse_args(argv: Sequence[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='sudoku', description='Solve Sudoku puzzles from files or stdin.')
+    parser.add_argument('files', nargs='*', metavar='FILE', help='puzzle files ("-" for stdin, the default when piped)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of solver processes (default 1)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='puzzles sent to a process at once (default 64)')
+    parser.add_argument('-t', '--techniques', help='comma-separated techniques to run, in order (default: all)')
+    parser.add_argument('--max-tier', help='run the techniques up to this one only')
+    parser.add_argument('--fallback', choices=('dlx',), help='complete the puzzles the techniques cannot solve by search')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='line', help='output format (default line)')
+    parser.add_argument('-o', '--output', help='write the solutions to this file instead of stdout')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not print the summary')
+    parser.add_argument('--profile', action='store_true', help='print the stats of each technique after the summary')
+    return parser.parse_args(argv)
+
+
+def select_techniques(techniques: str = None, max_tier: str = None) -> Tuple[str, ...]:
+    '''
+        Techniques named on the command line, all of them by default, cut after max_tier. Raise ValueError for an unknown name.
+    '''
+    from src.scheduler import TECHNIQUES
+
+    selected = TECHNIQUES if techniques is None else tuple(name.strip() for name in techniques.split(',') if name.strip())
+    unknown = [name for name in selected + ((max_tier,) if max_tier else ()) if name not in TECHNIQUES]
+    if unknown:
+        raise ValueError(f'unknown technique: {", ".join(unknown)} (choose from {", ".join(TECHNIQUES)})')
+    if max_tier is not None:
+        if max_tier not in selected:
+            raise ValueError(f'{max_tier} is not one of the selected techniques')
+        selected = selected[:selected.index(max_tier) + 1]
+    return selected
+
+
+def read_inputs(files: Sequence[str]) -> Iterator[Tuple[str, int, List[int]]]:
+    '''
+        Source name, line number and cells of each puzzle of the files, in order.
+    '''
+    from src.loader import iter_puzzles, read_puzzles
+
+    for name in files or ['-']:
+        if name == '-':
+            puzzles = read_puzzles(sys.stdin.buffer, '<stdin>')
+            name = '<stdin>'
+        elif name.endswith(DATABASE_SUFFIX):
+            puzzles = iter_database(name)
+        else:
+            puzzles = iter_puzzles(name)
+        for line_no, cells in puzzles:
+            yield name, line_no, cells
+
+
+def iter_database(name: str) -> Iterator[Tuple[int, List[int]]]:
+    '''
+        Puzzles of a binary database, numbered from 1 like lines.
+    '''
+    from src.database import PuzzleDatabase
+
+    with PuzzleDatabase(name) as database:
+        yield from enumerate(database, 1)
+
+
+def solve_inputs(inputs: Iterable[Tuple[str, int, List[int]]], args: argparse.Namespace, techniques: Tuple[str, ...],
+                 stats) -> Iterator[Tuple[Tuple[str, int, List[int]], object]]:
+    '''
+        Pair each input with its SolveResult, solving in this process or with a pool of args.jobs processes.
+    '''
+    # The solvers consume the inputs ahead of their results, which come back in the same order
+    pending = deque()
+
+    def puzzles() -> Iterator[List[int]]:
+        for source in inputs:
+            pending.append(source)
+            yield source[2]
+
+    if args.jobs > 1:
+        from src.parallel import solve_parallel
+        results = solve_parallel(puzzles(), jobs=args.jobs, chunk_size=args.chunk_size, techniques=techniques,
+                                 fallback=args.fallback, stats=stats)
+    else:
+        from src.batch import solve_many
+        from src.scheduler import Scheduler
+        results = solve_many(puzzles(), Scheduler(techniques), args.fallback, stats)
+    for result in results:
+        yield pending.popleft(), result
+
+
+def formatter(output_format: str, out: TextIO):
+    '''
+        Function turning an input and its result into the text written for them, writing the CSV header if needed.
+    '''
+    from src.util import cells_to_string
+
+    if output_format == 'line':
+        return lambda source, result: result.solution + '\n'
+    if output_format == 'jsonl':
+        import json
+
+        def jsonl(source, result) -> str:
+            name, line_no, cells = source
+            return json.dumps({'source': name, 'line': line_no, 'puzzle': cells_to_string(cells),
+                               'solution': result.solution, 'solved': result.solved, 'cells_solved': result.cells_solved,
+                               'elapsed': result.elapsed, 'techniques': result.techniques}) + '\n'
+        return jsonl
+
+    import csv
+    import io
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(CSV_HEADER)
+    out.write(buffer.getvalue())
+
+    def csv_row(source, result) -> str:
+        name, line_no, cells = source
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow((name, line_no, cells_to_string(cells), result.solution, int(result.solved), result.cells_solved,
+                         f'{result.elapsed * 1000:.3f}'))
+        return buffer.getvalue()
+    return csv_row
+
+
+def print_summary(latencies: List[float], solved: int, elapsed: float, jobs: int, file: TextIO):
+    from src.profiling import percentiles
+
+    count = len(latencies)
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f'{count} puzzles, {solved} solved, {count - solved} unsolved in {elapsed:.3f} s '
+          f'({rate:.1f} puzzles/s, {jobs} job{"s" if jobs > 1 else ""})', file=file)
+    if count:
+        latency = percentiles(latencies)
+        print('solve time ' + ', '.join(f'{rank} {value * 1000:.3f} ms' for rank, value in latency.items()) +
+              f', mean {sum(latencies) / count * 1000:.3f} ms', file=file)
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        techniques = select_techniques(args.techniques, args.max_tier)
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    stats = None
+    if args.profile:
+        from src.profiling import TechniqueStats
+        stats = TechniqueStats()
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        format_result = formatter(args.format, out)
+        latencies = []
+        solved = 0
+        batch = []
+        start = timer()
+        try:
+            for source, result in solve_inputs(read_inputs(args.files), args, techniques, stats):
+                latencies.append(result.elapsed)
+                solved += result.solved
+                batch.append(format_result(source, result))
+                if len(batch) >= WRITE_BATCH:
+                    out.write(''.join(batch))
+                    batch.clear()
+        except (OSError, ValueError) as e:
+            out.write(''.join(batch))
+            print(f'error: {e}', file=sys.stderr)
+            return 2
+        out.write(''.join(batch))
+        out.flush()
+        elapsed = timer() - start
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if not args.quiet:
+        print_summary(latencies, solved, elapsed, args.jobs, sys.stderr)
+    if stats is not None:
+        stats.display(file=sys.stderr)
+    return 0
+
+
+def demo() -> int:
+    from src.boards.difficulty import sudoku_evil
+
+    sudoku_evil().solve_and_display().display_candidates()
+    return 0
+
+
+def main(argv: Sequence[str] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv and sys.stdin.isatty():
+        return demo()
+    args = parse_args(argv)
+    if args.jobs < 1:
+        print('error: --jobs must be at least 1', file=sys.stderr)
+        return 2
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
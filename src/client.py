@@ -0,0 +1,155 @@
+"""
+    Client and load generator of the JSON-lines solving service (src.service).
+
+    A SolveClient multiplexes requests over a single connection: each request gets a new id, and a reader task hands every
+    answer to the request with the same id, so answers may arrive in any order.
+"""
+
+import asyncio
+import json
+from itertools import count
+from timeit import default_timer as timer
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+from src.profiling import percentiles
+from src.util import Puzzle, cells_to_string, parse_cells
+
+
+class ServiceError(Exception):
+    """
+        Raised when the service answers a request with an error.
+    """
+    pass
+
+
+class SolveClient:
+    """
+        Connection to a solving service, on a Unix socket at path or else on TCP host and port.
+    """
+
+    def __init__(self):
+        self.reader: asyncio.StreamReader = None
+        self.writer: asyncio.StreamWriter = None
+        self.ids = count(1)
+        self.waiting: Dict[int, asyncio.Future] = {}
+        self.listener: asyncio.Task = None
+
+    @classmethod
+    async def connect(cls, host: str = None, port: int = None, path: str = None) -> 'SolveClient':
+        client = cls()
+        if path is not None:
+            client.reader, client.writer = await asyncio.open_unix_connection(path)
+        else:
+            client.reader, client.writer = await asyncio.open_connection(host, port)
+        client.listener = asyncio.create_task(client.listen())
+        return client
+
+    async def listen(self):
+        '''
+            Hand each answer to the request waiting for its id. Fail the waiting requests when the connection ends.
+        '''
+        error = ConnectionError('connection closed by the service')
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self.waiting.pop(message.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, ValueError) as e:
+            error = e
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(error)
+        self.waiting.clear()
+
+    async def call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        '''
+            Send a request and wait for its answer. Raise ServiceError if the answer is an error.
+        '''
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(json.dumps(dict(message, id=request_id)).encode() + b'\n')
+        await self.writer.drain()
+        answer = await future
+        if 'error' in answer:
+            raise ServiceError(answer['error'])
+        return answer
+
+    async def solve(self, puzzle: Puzzle, timeout: float = None) -> Dict[str, Any]:
+        message = {'puzzle': cells_to_string(parse_cells(puzzle))}
+        if timeout is not None:
+            message['timeout'] = timeout
+        return await self.call(message)
+
+    async def stats(self) -> Dict[str, Any]:
+        return (await self.call({'type': 'stats'}))['stats']
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        if self.listener is not None:
+            await self.listener
+
+    async def __aenter__(self) -> 'SolveClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class LoadReport(NamedTuple):
+    requests: int
+    solved: int
+    errors: int
+    elapsed: float
+    throughput: float
+    latency: Dict[str, float]
+    server: Dict[str, Any]
+
+
+async def load_test(puzzles: Iterable[Puzzle], host: str = None, port: int = None, path: str = None,
+                    concurrency: int = 64, connections: int = 1, timeout: float = None) -> LoadReport:
+    '''
+        Send every puzzle to the service with at most concurrency requests in flight, spread over connections,
+        and report the throughput and the latencies seen by the client, with the stats of the server at the end.
+    '''
+    clients = [await SolveClient.connect(host, port, path) for _ in range(connections)]
+    puzzles = iter(puzzles)
+    latencies: List[float] = []
+    solved = 0
+    errors = 0
+
+    async def worker(client: SolveClient):
+        nonlocal solved, errors
+        for puzzle in puzzles:
+            start = timer()
+            try:
+                answer = await client.solve(puzzle, timeout)
+                solved += answer['solved']
+            except ServiceError:
+                errors += 1
+            latencies.append(timer() - start)
+
+    start = timer()
+    try:
+        await asyncio.gather(*(worker(clients[k % connections]) for k in range(concurrency)))
+        elapsed = timer() - start
+        server = await clients[0].stats()
+    finally:
+        for client in clients:
+            await client.close()
+    requests = len(latencies)
+    return LoadReport(requests, solved, errors, elapsed, requests / elapsed if elapsed > 0 else 0.0,
+                      percentiles(latencies), server)
+
+
+def run_load_test(puzzles: Iterable[Puzzle], host: str = None, port: int = None, path: str = None,
+                  concurrency: int = 64, connections: int = 1, timeout: float = None) -> LoadReport:
+    return asyncio.run(load_test(puzzles, host, port, path, concurrency, connections, timeout))
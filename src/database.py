@@ -0,0 +1,223 @@
+"""
+    Binary puzzle database: fixed-size records behind a header, read through a memory map.
+
+    A grid is packed at 4 bits per cell, two cells per byte with the first one in the high nibble, in 41 bytes.
+    Each record holds the puzzle, then optionally its solution (an empty grid if it has none) and its grade
+    (solved flag, tier and score, as in src.grader). Every record has the same size, so record k starts at
+    HEADER_SIZE + k * stride and is read without decoding the others.
+
+    Header (little endian): magic b'SUDB', format version, flags (HAS_SOLUTIONS, HAS_GRADES), stride, record count.
+"""
+
+import mmap
+import struct
+from typing import Iterator, List, NamedTuple, Sequence
+
+from src.grader import Grade, Grader
+from src.loader import iter_puzzles
+from src.scheduler import TECHNIQUES
+from src.search import count_solutions
+from src.sudoku import Sudoku
+from src.util import DECODE_TABLE, Puzzle, cells_to_string, parse_cells
+
+MAGIC = b'SUDB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHQ16x')
+HEADER_SIZE = HEADER.size
+GRID_SIZE = 41
+GRADE = struct.Struct('<BBI')
+
+HAS_SOLUTIONS = 1
+HAS_GRADES = 2
+
+# Records decoded at once when iterating
+READ_BATCH = 4096
+
+
+class GradeRecord(NamedTuple):
+    solved: bool
+    tier: int
+    score: int
+
+
+class Record(NamedTuple):
+    puzzle: List[int]
+    solution: List[int]
+    grade: GradeRecord
+
+
+def pack_grid(cells: Sequence[int]) -> bytes:
+    '''
+        41 bytes of 4-bit cells.
+    '''
+    return bytes.fromhex(cells_to_string(cells) + '0')
+
+
+def unpack_grid(data: bytes) -> List[int]:
+    return list(data.hex().encode('ascii')[:81].translate(DECODE_TABLE))
+
+
+def record_stride(flags: int) -> int:
+    stride = GRID_SIZE
+    if flags & HAS_SOLUTIONS:
+        stride += GRID_SIZE
+    if flags & HAS_GRADES:
+        stride += GRADE.size
+    return stride
+
+
+class DatabaseWriter:
+    """
+        Append puzzles to a new database file. The record count is written in the header on close.
+    """
+
+    def __init__(self, path: str, solutions: bool = False, grades: bool = False):
+        self.flags = (HAS_SOLUTIONS if solutions else 0) | (HAS_GRADES if grades else 0)
+        self.stride = record_stride(self.flags)
+        self.count = 0
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.flags, self.stride, 0))
+
+    def add(self, puzzle: Puzzle, solution: Puzzle = None, grade: Grade = None):
+        '''
+            Append a puzzle, with its solution and grade if the database stores them.
+        '''
+        record = pack_grid(parse_cells(puzzle))
+        if self.flags & HAS_SOLUTIONS:
+            record += pack_grid(parse_cells(solution) if solution is not None else [0] * 81)
+        if self.flags & HAS_GRADES:
+            if grade is None:
+                record += GRADE.pack(0, 0, 0)
+            else:
+                record += GRADE.pack(grade.solved, min(grade.tier, 255), min(grade.score, 0xFFFFFFFF))
+        self.file.write(record)
+        self.count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.flags, self.stride, self.count))
+        self.file.close()
+
+    def __enter__(self) -> 'DatabaseWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PuzzleDatabase:
+    """
+        Read-only view of a database file through a memory map. db[k] is the cells of puzzle k, in O(1).
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER_SIZE:
+            self.map.close()
+            raise ValueError(f'{path}: not a puzzle database')
+        magic, version, self.flags, self.stride, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f'{path}: not a puzzle database')
+        if version != VERSION or self.stride != record_stride(self.flags):
+            self.map.close()
+            raise ValueError(f'{path}: unsupported database version {version}')
+        if len(self.map) < HEADER_SIZE + self.count * self.stride:
+            self.map.close()
+            raise ValueError(f'{path}: truncated database, {self.count} records expected')
+
+    @property
+    def has_solutions(self) -> bool:
+        return bool(self.flags & HAS_SOLUTIONS)
+
+    @property
+    def has_grades(self) -> bool:
+        return bool(self.flags & HAS_GRADES)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def offset(self, k: int) -> int:
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError('puzzle index out of range')
+        return HEADER_SIZE + k * self.stride
+
+    def __getitem__(self, k: int) -> List[int]:
+        start = self.offset(k)
+        return unpack_grid(self.map[start:start + GRID_SIZE])
+
+    def solution(self, k: int) -> List[int]:
+        '''
+            Cells of the solution of puzzle k (None if the database has no solutions, all zeros if the puzzle has none).
+        '''
+        if not self.has_solutions:
+            return None
+        start = self.offset(k) + GRID_SIZE
+        return unpack_grid(self.map[start:start + GRID_SIZE])
+
+    def grade(self, k: int) -> GradeRecord:
+        if not self.has_grades:
+            return None
+        solved, tier, score = GRADE.unpack_from(self.map, self.offset(k) + self.stride - GRADE.size)
+        return GradeRecord(bool(solved), tier, score)
+
+    def record(self, k: int) -> Record:
+        return Record(self[k], self.solution(k), self.grade(k))
+
+    def __iter__(self) -> Iterator[List[int]]:
+        '''
+            Cells of each puzzle in order, decoded READ_BATCH records at a time.
+        '''
+        stride = self.stride
+        for first in range(0, self.count, READ_BATCH):
+            n = min(READ_BATCH, self.count - first)
+            start = HEADER_SIZE + first * stride
+            if stride == GRID_SIZE:
+                digits = self.map[start:start + n * stride].hex().encode('ascii').translate(DECODE_TABLE)
+            else:
+                block = self.map[start:start + n * stride]
+                digits = b''.join(block[k:k + GRID_SIZE] for k in range(0, len(block), stride)).hex().encode('ascii')
+                digits = digits.translate(DECODE_TABLE)
+            for k in range(0, n * 82, 82):
+                yield list(digits[k:k + 81])
+
+    def sudokus(self) -> Iterator[Sudoku]:
+        '''
+            A single Sudoku, reset to each puzzle in turn.
+        '''
+        sudoku = Sudoku()
+        for cells in self:
+            sudoku.reset(cells)
+            yield sudoku
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self) -> 'PuzzleDatabase':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def convert_text(source: str, target: str, solutions: bool = False, grades: bool = False,
+                 techniques: Sequence[str] = TECHNIQUES) -> int:
+    '''
+        Write the puzzles of a text file to a new database, with their solutions (found by search) and their grades if asked.
+        Return the number of puzzles written.
+    '''
+    grader = Grader(techniques) if grades else None
+    with DatabaseWriter(target, solutions, grades) as writer:
+        for _, cells in iter_puzzles(source):
+            solution = None
+            if solutions:
+                solution = []
+                if not count_solutions(cells, limit=1, solution=solution):
+                    solution = None
+            writer.add(cells, solution, grader.grade(cells) if grader is not None else None)
+        return writer.count
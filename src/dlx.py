@@ -0,0 +1,87 @@
+"""
+    Exact cover search (Knuth's Algorithm X) used to complete a Sudoku the logical techniques could not solve.
+
+    Columns are covered by removing their rows from the other columns (the dancing links idea),
+    with a dict of sets per column instead of linked nodes, which is faster in Python.
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from src.candidates import MASK_DIGITS
+from src.topology import POSITIONS
+
+Choice = Tuple[int, int]
+
+
+def constraints_of(i: int, d: int) -> Tuple[int, int, int, int]:
+    '''
+        Constraints satisfied by placing digit d in cell i: the cell, then digit d in its row, column and box.
+    '''
+    r, c, b = POSITIONS[i]
+    return i, 81 + r * 9 + d - 1, 162 + c * 9 + d - 1, 243 + b * 9 + d - 1
+
+
+def cover(columns: Dict[int, Set[Choice]], rows: Dict[Choice, Tuple[int, ...]], row: Choice) -> List[Set[Choice]]:
+    removed = []
+    for j in rows[row]:
+        for other in columns[j]:
+            for k in rows[other]:
+                if k != j:
+                    columns[k].discard(other)
+        removed.append(columns.pop(j))
+    return removed
+
+
+def uncover(columns: Dict[int, Set[Choice]], rows: Dict[Choice, Tuple[int, ...]], row: Choice, removed: List[Set[Choice]]):
+    for j in reversed(rows[row]):
+        columns[j] = removed.pop()
+        for other in columns[j]:
+            for k in rows[other]:
+                if k != j:
+                    columns[k].add(other)
+
+
+def search(columns: Dict[int, Set[Choice]], rows: Dict[Choice, Tuple[int, ...]], solution: List[Choice]) -> bool:
+    if not columns:
+        return True
+    # Branch on the column with the fewest rows
+    j = min(columns, key=lambda k: len(columns[k]))
+    for row in list(columns[j]):
+        solution.append(row)
+        removed = cover(columns, rows, row)
+        if search(columns, rows, solution):
+            return True
+        uncover(columns, rows, row, removed)
+        solution.pop()
+    return False
+
+
+def solve_exact_cover(cells: Sequence[int], masks: Sequence[int]) -> Optional[List[int]]:
+    '''
+        Complete a grid, only trying the candidates left in masks for the empty cells. Return the solved cells, or None if there is no solution.
+    '''
+    satisfied = set()
+    for i in range(81):
+        if cells[i] != 0:
+            satisfied.update(constraints_of(i, cells[i]))
+
+    columns = {j: set() for j in range(324) if j not in satisfied}
+    rows = {}
+    for i in range(81):
+        if cells[i] != 0:
+            continue
+        for d in MASK_DIGITS[masks[i]]:
+            constraints = constraints_of(i, d)
+            # Skip candidates that conflict with a placed digit
+            if all(j in columns for j in constraints):
+                rows[(i, d)] = constraints
+                for j in constraints:
+                    columns[j].add((i, d))
+
+    solution = []
+    if not search(columns, rows, solution):
+        return None
+    solved = list(cells)
+    for i, d in solution:
+        solved[i] = d
+    return solved
@@ -0,0 +1,105 @@
+"""
+    Fish (X-Wing, Swordfish, Jellyfish) over a per-digit line index, with their finned and sashimi variants.
+
+    For a digit, lines[k] is the mask of the cross lines where the digit is a candidate in base line k:
+    the columns of each row, or the rows of each column. A fish of size n is n base lines whose masks OR to n cover lines,
+    so the digit is confined to the base lines inside the cover lines and can be removed from the rest of the cover lines.
+    A finned fish has extra candidates (fins) in a single box: either a fin is the digit, or the fish holds,
+    so the digit can be removed from the cover lines inside the box of the fins. A sashimi fish is a finned fish
+    with a base line reduced to a single candidate outside the fins, and needs no special case.
+"""
+
+from itertools import combinations
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+from src.candidates import MASK_DIGITS, POPCOUNT
+from src.topology import COLUMN_OF, ROW_OF
+
+Lines = List[int]
+
+STACK_MASKS = (0b000000111, 0b000111000, 0b111000000)
+
+
+class Fish(NamedTuple):
+    base: Tuple[int, ...]
+    cover: int
+    fins: int
+    targets: Tuple[Tuple[int, int], ...]
+
+
+class LineIndex(NamedTuple):
+    rows: Tuple[Lines, ...]
+    columns: Tuple[Lines, ...]
+
+
+def line_index(masks: Sequence[int]) -> LineIndex:
+    '''
+        For each digit, the columns of each row and the rows of each column where it is a candidate.
+    '''
+    rows = tuple([0] * 9 for _ in range(10))
+    columns = tuple([0] * 9 for _ in range(10))
+    for i in range(81):
+        mask = masks[i]
+        if mask:
+            r = ROW_OF[i]
+            c = COLUMN_OF[i]
+            for d in MASK_DIGITS[mask]:
+                rows[d][r] |= 1 << c
+                columns[d][c] |= 1 << r
+    return LineIndex(rows, columns)
+
+
+def fish_targets(lines: Lines, base: Tuple[int, ...], cover: int, band: int = None) -> Tuple[Tuple[int, int], ...]:
+    '''
+        (line, cross line) pairs of the candidates in the cover lines outside the base lines, only in the lines of band if given.
+    '''
+    targets = []
+    for k in range(9):
+        if k in base or band is not None and k // 3 != band:
+            continue
+        found = lines[k] & cover
+        while found:
+            low = found & -found
+            targets.append((k, low.bit_length() - 1))
+            found ^= low
+    return tuple(targets)
+
+
+def find_fish(lines: Lines, n: int, finned: bool = False, dirty: Sequence[bool] = None) -> Iterator[Fish]:
+    '''
+        Fish of size n with candidates to remove, over the lines of a digit. Only the basic fish, or only the finned ones.
+        If dirty is given, fish none of whose base lines is dirty are skipped.
+    '''
+    if not finned:
+        valid = [k for k in range(9) if 2 <= POPCOUNT[lines[k]] <= n]
+        for base in combinations(valid, n):
+            cover = 0
+            for k in base:
+                cover |= lines[k]
+            if POPCOUNT[cover] != n or dirty is not None and not any(dirty[k] for k in base):
+                continue
+            targets = fish_targets(lines, base, cover)
+            if targets:
+                yield Fish(base, cover, 0, targets)
+        return
+
+    # The fins are a part of the union in one stack, leaving n cover lines
+    valid = [k for k in range(9) if 1 <= POPCOUNT[lines[k]] <= n + 3]
+    for base in combinations(valid, n):
+        union = 0
+        for k in base:
+            union |= lines[k]
+        if not n < POPCOUNT[union] <= n + 3 or dirty is not None and not any(dirty[k] for k in base):
+            continue
+        for stack in STACK_MASKS:
+            extra = union & stack
+            fins = extra
+            while fins:
+                cover = union & ~fins
+                if POPCOUNT[cover] == n and cover & stack:
+                    bands = set(k // 3 for k in base if lines[k] & fins)
+                    if len(bands) == 1:
+                        targets = fish_targets(lines, base, cover & stack, bands.pop())
+                        if targets:
+                            yield Fish(base, cover, fins, targets)
+                fins = (fins - 1) & extra
@@ -0,0 +1,106 @@
+"""
+    Generation of unique puzzles.
+
+    A random full grid is found by a search trying digits in random order, then givens are removed in random order as long
+    as the solution stays unique. The resulting minimal puzzle is kept if the hardest technique it needs is in the requested tiers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+from src.grader import Grade, Grader, Tier
+from src.scheduler import TECHNIQUES
+from src.search import count_solutions, has_other_solution
+from src.util import cells_to_string
+
+
+class GeneratedPuzzle(NamedTuple):
+    puzzle: str
+    solution: str
+    grade: Grade
+
+
+class Generator:
+    """
+        Seedable puzzle generator. The same seed and tiers give the same sequence of puzzles.
+    """
+
+    def __init__(self, seed: int = None, techniques: Sequence[str] = TECHNIQUES):
+        self.rng = Random(seed)
+        self.grader = Grader(techniques)
+
+    def grid(self) -> List[int]:
+        '''
+            A random full grid.
+        '''
+        solution = []
+        count_solutions([0] * 81, limit=1, solution=solution, rng=self.rng)
+        return solution
+
+    def minimize(self, solution: Sequence[int]) -> List[int]:
+        '''
+            Remove givens of a full grid in random order while the puzzle keeps a unique solution.
+        '''
+        puzzle = list(solution)
+        order = list(range(81))
+        self.rng.shuffle(order)
+        for i in order:
+            if not has_other_solution(puzzle, i):
+                puzzle[i] = 0
+        return puzzle
+
+    def generate(self, min_tier: Tier = None, max_tier: Tier = None, attempts: int = None) -> GeneratedPuzzle:
+        '''
+            Generate a unique puzzle whose hardest technique is between min_tier and max_tier.
+            Puzzles the techniques cannot solve are graded past the last tier. Return None after attempts rejected puzzles.
+        '''
+        grader = self.grader
+        low = 0 if min_tier is None else grader.tier(min_tier)
+        high = len(grader.techniques) if max_tier is None else grader.tier(max_tier)
+        if low > high:
+            raise ValueError(f'min_tier {min_tier} is harder than max_tier {max_tier}')
+        attempt = 0
+        while attempts is None or attempt < attempts:
+            attempt += 1
+            solution = self.grid()
+            puzzle = self.minimize(solution)
+            grade = grader.grade(puzzle, max_tier)
+            if low <= grade.tier <= high:
+                return GeneratedPuzzle(cells_to_string(puzzle), cells_to_string(solution), grade)
+        return None
+
+
+def generate_puzzles(count: int, seed: int = None, min_tier: Tier = None, max_tier: Tier = None,
+                     techniques: Sequence[str] = TECHNIQUES) -> Iterator[GeneratedPuzzle]:
+    generator = Generator(seed, techniques)
+    for _ in range(count):
+        yield generator.generate(min_tier, max_tier)
+
+
+def _generate_chunk(seed: int, count: int, min_tier: Tier, max_tier: Tier, techniques: Sequence[str]) -> List[GeneratedPuzzle]:
+    return list(generate_puzzles(count, seed, min_tier, max_tier, techniques))
+
+
+def _chunk_seeds(seed: int, count: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    '''
+        Seed and size of each chunk. Chunk seeds are drawn from seed, so a seeded run does not depend on the number of jobs.
+    '''
+    rng = Random(seed)
+    for start in range(0, count, chunk_size):
+        yield rng.getrandbits(64), min(chunk_size, count - start)
+
+
+def generate_parallel(count: int, seed: int = None, min_tier: Tier = None, max_tier: Tier = None, jobs: int = None,
+                      chunk_size: int = 16, techniques: Sequence[str] = TECHNIQUES) -> Iterator[GeneratedPuzzle]:
+    '''
+        Generate count puzzles with a pool of worker processes, each generating chunks of chunk_size puzzles.
+    '''
+    jobs = jobs or os.cpu_count() or 1
+    techniques = tuple(techniques)
+    with ProcessPoolExecutor(jobs) as executor:
+        futures = [executor.submit(_generate_chunk, chunk_seed, n, min_tier, max_tier, techniques)
+                   for chunk_seed, n in _chunk_seeds(seed, count, chunk_size)]
+        for future in futures:
+            yield from future.result()
@@ -0,0 +1,77 @@
+"""
+    Difficulty grading of puzzles.
+
+    The tiers are the techniques of the scheduler, in order. A puzzle is graded by the hardest technique the scheduler
+    needs to solve it, the progress made by each technique, and a score weighting that progress by tier.
+"""
+
+from typing import Dict, Iterable, Iterator, NamedTuple, Sequence, Tuple, Union
+
+from src.loader import iter_puzzles
+from src.scheduler import TECHNIQUES, Scheduler
+from src.sudoku import Sudoku
+from src.util import Puzzle, parse_cells
+
+Tier = Union[int, str]
+
+
+class Grade(NamedTuple):
+    solved: bool
+    hardest: str
+    tier: int
+    steps: Dict[str, int]
+    score: int
+
+
+class Grader:
+    """
+        Grade puzzles with a single Sudoku, reset for each puzzle.
+        With max_tier, only the techniques up to that tier are run: a puzzle that needs a harder one is left unsolved,
+        and graded past max_tier without running the expensive techniques.
+    """
+
+    def __init__(self, techniques: Sequence[str] = TECHNIQUES):
+        self.techniques = tuple(techniques)
+        self.tiers = {name: tier for tier, name in enumerate(self.techniques)}
+        self.schedulers = [Scheduler(self.techniques[:tier + 1]) for tier in range(len(self.techniques))]
+        self.sudoku = Sudoku()
+
+    def tier(self, tier: Tier) -> int:
+        if isinstance(tier, str):
+            if tier not in self.tiers:
+                raise ValueError(f'Unknown technique: {tier}')
+            return self.tiers[tier]
+        if not 0 <= tier < len(self.techniques):
+            raise ValueError(f'Tier out of range: {tier}')
+        return tier
+
+    def grade(self, puzzle: Puzzle, max_tier: Tier = None) -> Grade:
+        '''
+            Grade a puzzle. An unsolved puzzle has no hardest technique, and the tier after the last one run.
+        '''
+        last = len(self.techniques) - 1 if max_tier is None else self.tier(max_tier)
+        sudoku = self.sudoku
+        sudoku.reset(parse_cells(puzzle))
+        sudoku.scheduler = self.schedulers[last]
+        sudoku.solve()
+        steps = sudoku.techniques_used
+        score = sum((self.tiers[name] + 1) * cnt for name, cnt in steps.items())
+        if not sudoku.solved:
+            return Grade(False, None, last + 1, steps, score)
+        tier = max((self.tiers[name] for name in steps), default=0)
+        return Grade(True, self.techniques[tier], tier, steps, score)
+
+
+def grade_many(puzzles: Iterable[Puzzle], max_tier: Tier = None, techniques: Sequence[str] = TECHNIQUES) -> Iterator[Grade]:
+    grader = Grader(techniques)
+    for puzzle in puzzles:
+        yield grader.grade(puzzle, max_tier)
+
+
+def grade_file(filename: str, max_tier: Tier = None, techniques: Sequence[str] = TECHNIQUES) -> Iterator[Tuple[int, Grade]]:
+    '''
+        Grade the puzzles of a file, yielding the line number of each puzzle with its grade.
+    '''
+    grader = Grader(techniques)
+    for line_no, cells in iter_puzzles(filename):
+        yield line_no, grader.grade(cells, max_tier)
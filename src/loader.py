@@ -0,0 +1,73 @@
+"""
+    Streaming loader for puzzle files.
+
+    A file may hold puzzles of 81 digits per line, grids of 9 lines of 9 digits, or both. Blanks are '0' or '.'.
+    Text after '#' is a comment, and spaces and empty lines are ignored.
+"""
+
+import mmap
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+
+from src.util import DECODE_TABLE
+
+NumberedPuzzle = Tuple[int, List[int]]
+
+IGNORED = b' \t\r\n'
+
+
+def iter_puzzle_lines(lines: Iterable[bytes], name: str = '<stream>') -> Iterator[NumberedPuzzle]:
+    '''
+        Decode puzzles from lines of bytes, yielding the line number where each puzzle starts and its cells.
+    '''
+    grid = b''
+    grid_line_no = 0
+    line_no = 0
+    for line_no, line in enumerate(lines, 1):
+        if b'#' in line:
+            line = line[:line.index(b'#')]
+        line = line.translate(DECODE_TABLE, IGNORED)
+        if not line:
+            continue
+        if max(line) > 9:
+            raise ValueError(f'{name}:{line_no}: each cell must be a digit or "."')
+        if len(line) == 81 and not grid:
+            yield line_no, list(line)
+        elif len(line) == 9:
+            if not grid:
+                grid_line_no = line_no
+            grid += line
+            if len(grid) == 81:
+                yield grid_line_no, list(grid)
+                grid = b''
+        else:
+            raise ValueError(f'{name}:{line_no}: expected a line of 81 or 9 cells, got {len(line)}')
+    if grid:
+        raise ValueError(f'{name}:{line_no}: incomplete grid starting at line {grid_line_no}')
+
+
+def read_puzzles(stream: BinaryIO, name: str = '<stream>') -> Iterator[NumberedPuzzle]:
+    '''
+        Decode puzzles from a binary stream, such as sys.stdin.buffer, reading it in buffered blocks.
+    '''
+    return iter_puzzle_lines(stream, name)
+
+
+def iter_puzzles(filename: str) -> Iterator[NumberedPuzzle]:
+    '''
+        Decode puzzles from a file lazily, through a memory map.
+    '''
+    with open(filename, 'rb') as f:
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with m:
+            yield from iter_puzzle_lines(iter(m.readline, b''), filename)
+
+
+def load_puzzles(filename: str) -> Iterator[List[int]]:
+    '''
+        Cells of the puzzles of a file, without line numbers.
+    '''
+    return (cells for _, cells in iter_puzzles(filename))
@@ -0,0 +1,142 @@
+"""
+    Multi-process batch solving.
+
+    Puzzles are shipped to the workers in chunks of raw bytes (one byte per cell), and each worker process reuses a single Sudoku.
+    With shared memory, puzzles and solutions are exchanged through shared blocks instead, and workers only return the statistics.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, Executor, ProcessPoolExecutor,
+                                wait)
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Sequence,
+                    Tuple)
+
+from src.batch import SolveResult, solve_cells
+from src.profiling import TechniqueStats
+from src.scheduler import TECHNIQUES, Scheduler
+from src.sudoku import Sudoku
+from src.util import Puzzle, cells_to_string, parse_cells
+
+_sudoku: Sudoku = None
+_fallback: str = None
+
+Stats = Tuple[bool, int, float, Dict[str, int]]
+ProfileStats = Dict[str, Dict[str, float]]
+
+
+def _init_worker(techniques: Sequence[str], fallback: str, profile: bool):
+    global _sudoku, _fallback
+    _sudoku = Sudoku()
+    _sudoku.scheduler = Scheduler(techniques)
+    _sudoku.stats = TechniqueStats() if profile else None
+    _fallback = fallback
+
+
+def _take_profile() -> ProfileStats:
+    '''
+        Technique stats of the worker since the last call.
+    '''
+    if _sudoku.stats is None:
+        return None
+    stats = _sudoku.stats.as_dict()
+    _sudoku.stats = TechniqueStats()
+    return stats
+
+
+def _solve_chunk(chunk: bytes) -> Tuple[List[SolveResult], ProfileStats]:
+    results = [solve_cells(_sudoku, list(chunk[k:k + 81]), _fallback) for k in range(0, len(chunk), 81)]
+    return results, _take_profile()
+
+
+def _solve_shared(puzzles_name: str, solutions_name: str, start: int, stop: int) -> Tuple[int, List[Stats], ProfileStats]:
+    puzzles = SharedMemory(name=puzzles_name)
+    solutions = SharedMemory(name=solutions_name)
+    try:
+        stats = []
+        for k in range(start, stop):
+            result = solve_cells(_sudoku, list(puzzles.buf[k * 81:k * 81 + 81]), _fallback)
+            solutions.buf[k * 81:k * 81 + 81] = bytes(_sudoku.cells)
+            stats.append((result.solved, result.cells_solved, result.elapsed, result.techniques))
+        return start, stats, _take_profile()
+    finally:
+        puzzles.close()
+        solutions.close()
+
+
+def _submit_all(executor: Executor, fn: Callable, tasks: Iterable[Tuple], max_pending: int, ordered: bool) -> Iterator[Any]:
+    '''
+        Submit tasks with at most max_pending of them in flight. Yield their results in submission order, or in completion order.
+    '''
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield from _collect(pending, ordered)
+        pending.append(executor.submit(fn, *task))
+    while pending:
+        yield from _collect(pending, ordered)
+
+
+def _collect(pending: deque, ordered: bool) -> Iterator[Any]:
+    if ordered:
+        yield pending.popleft().result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield future.result()
+
+
+def _chunks(puzzles: Iterable[Puzzle], chunk_size: int) -> Iterator[Tuple[bytes]]:
+    puzzles = iter(puzzles)
+    while True:
+        chunk = b''.join(bytes(parse_cells(puzzle)) for puzzle in islice(puzzles, chunk_size))
+        if not chunk:
+            return
+        yield (chunk,)
+
+
+def solve_parallel(puzzles: Iterable[Puzzle], jobs: int = None, chunk_size: int = 64, ordered: bool = True,
+                   techniques: Sequence[str] = TECHNIQUES, fallback: str = None, shared: bool = False,
+                   stats: TechniqueStats = None) -> Iterator[SolveResult]:
+    '''
+        Solve puzzles with a pool of worker processes, yielding results in input order (ordered) or as chunks complete.
+        With shared, the puzzles are read up front into shared memory. If stats is given, the technique stats of the workers are merged into it.
+    '''
+    jobs = jobs or os.cpu_count() or 1
+    initargs = (tuple(techniques), fallback, stats is not None)
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=initargs) as executor:
+        if shared:
+            yield from _solve_parallel_shared(executor, puzzles, jobs, chunk_size, ordered, stats)
+            return
+        for results, profile in _submit_all(executor, _solve_chunk, _chunks(puzzles, chunk_size), jobs * 2, ordered):
+            if profile is not None:
+                stats.merge_dict(profile)
+            yield from results
+
+
+def _solve_parallel_shared(executor: Executor, puzzles: Iterable[Puzzle], jobs: int, chunk_size: int, ordered: bool,
+                           stats: TechniqueStats) -> Iterator[SolveResult]:
+    data = b''.join(bytes(parse_cells(puzzle)) for puzzle in puzzles)
+    n = len(data) // 81
+    if n == 0:
+        return
+    puzzles_block = SharedMemory(create=True, size=len(data))
+    solutions_block = SharedMemory(create=True, size=len(data))
+    try:
+        puzzles_block.buf[:len(data)] = data
+        del data
+        tasks = ((puzzles_block.name, solutions_block.name, start, min(start + chunk_size, n)) for start in range(0, n, chunk_size))
+        for start, results, profile in _submit_all(executor, _solve_shared, tasks, jobs * 2, ordered):
+            if profile is not None:
+                stats.merge_dict(profile)
+            for k, (solved, cells_solved, elapsed, techniques) in enumerate(results, start):
+                solution = cells_to_string(bytes(solutions_block.buf[k * 81:k * 81 + 81]))
+                yield SolveResult(solution, solved, cells_solved, elapsed, techniques)
+    finally:
+        puzzles_block.close()
+        puzzles_block.unlink()
+        solutions_block.close()
+        solutions_block.unlink()
@@ -0,0 +1,69 @@
+"""
+    Per-technique profiling counters of the Sudoku solver.
+"""
+
+from typing import Dict, Iterable, Sequence, TextIO
+
+FIELDS = ('calls', 'time', 'eliminated', 'placed', 'noops')
+
+
+def percentiles(values: Sequence[float], ranks: Iterable[int] = (50, 90, 99)) -> Dict[str, float]:
+    '''
+        Nearest-rank percentiles of values, keyed "p50", "p90"... (None if there are no values).
+    '''
+    ordered = sorted(values)
+    result = {}
+    for rank in ranks:
+        if ordered:
+            k = max(0, min(len(ordered) - 1, (len(ordered) * rank + 99) // 100 - 1))
+            result[f'p{rank}'] = ordered[k]
+        else:
+            result[f'p{rank}'] = None
+    return result
+
+
+class TechniqueStats:
+    """
+        For each technique: number of calls, wall time in seconds, candidates eliminated, cells placed and calls without progress.
+        Set a TechniqueStats as Sudoku.stats to record the techniques run by the scheduler. The same stats can be shared
+        by many Sudokus, or merged, to aggregate a batch.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed: float, eliminated: int, placed: int):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = dict.fromkeys(FIELDS, 0)
+        stats['calls'] += 1
+        stats['time'] += elapsed
+        stats['eliminated'] += eliminated
+        stats['placed'] += placed
+        if eliminated == 0 and placed == 0:
+            stats['noops'] += 1
+
+    def merge(self, other: 'TechniqueStats'):
+        self.merge_dict(other.stats)
+
+    def merge_dict(self, stats: Dict[str, Dict[str, float]]):
+        for name, other in stats.items():
+            current = self.stats.setdefault(name, dict.fromkeys(FIELDS, 0))
+            for field in FIELDS:
+                current[field] += other[field]
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(stats) for name, stats in self.stats.items()}
+
+    @classmethod
+    def aggregate(cls, stats: Iterable['TechniqueStats']) -> 'TechniqueStats':
+        total = cls()
+        for s in stats:
+            total.merge(s)
+        return total
+
+    def display(self, file: TextIO = None):
+        print(f"{'technique':<24} {'calls':>8} {'time ms':>10} {'eliminated':>11} {'placed':>8} {'no-ops':>8}", file=file)
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1]['time']):
+            print(f"{name:<24} {stats['calls']:8d} {stats['time'] * 1000:10.2f} {stats['eliminated']:11d} "
+                  f"{stats['placed']:8d} {stats['noops']:8d}", file=file)
@@ -0,0 +1,98 @@
+"""
+    Technique scheduler of the Sudoku solver.
+
+    Techniques are Sudoku method names that take no argument and return the number of cells placed or candidates eliminated.
+"""
+
+from timeit import default_timer as timer
+from typing import Dict, Sequence
+
+PLACEMENT_TECHNIQUES = (
+    'solve_hidden_singles',
+)
+
+# Ordered from the cheapest to the most expensive
+ELIMINATION_TECHNIQUES = (
+    'pointing_pair',
+    'box_line_reduction',
+    'naked_subsets',
+    'hidden_subsets',
+    'box_box_reduction',
+    'x_wing',
+    'y_wing',
+    'swordfish',
+    'xyz_wing',
+    'jellyfish',
+    'w_wing',
+    'wxyz_wing',
+    'finned_x_wing',
+    'finned_swordfish',
+    'finned_jellyfish',
+    'simple_coloring',
+    'x_chain',
+    'xy_chain',
+    'aic',
+)
+
+TECHNIQUES = PLACEMENT_TECHNIQUES + ELIMINATION_TECHNIQUES
+
+
+class Scheduler:
+    """
+        Run an ordered list of techniques on a Sudoku, cheapest first.
+        After any progress, go back to the cheapest technique. Stop when no technique makes progress.
+    """
+
+    def __init__(self, techniques: Sequence[str] = TECHNIQUES):
+        self.techniques = tuple(techniques)
+
+    def run(self, sudoku) -> Dict[str, int]:
+        """
+            Run the techniques until a fixpoint. Return the progress made by each technique that made any.
+        """
+        if sudoku.stats is not None or sudoku.trace is not None:
+            return self.run_instrumented(sudoku)
+        names = self.techniques
+        techniques = [getattr(sudoku, name) for name in names]
+        progress = {}
+        k = 0
+        while k < len(techniques):
+            cnt = techniques[k]()
+            if cnt:
+                progress[names[k]] = progress.get(names[k], 0) + cnt
+                k = 0
+            else:
+                k += 1
+        return progress
+
+    def run_instrumented(self, sudoku) -> Dict[str, int]:
+        """
+            Same as run, recording each technique call in sudoku.stats and tagging the events of sudoku.trace
+            with the technique that made them.
+        """
+        names = self.techniques
+        techniques = [getattr(sudoku, name) for name in names]
+        stats = sudoku.stats
+        trace = sudoku.trace
+        cells = sudoku.cells
+        candidates = sudoku.candidates
+        progress = {}
+        k = 0
+        while k < len(techniques):
+            if trace is not None:
+                trace.set_technique(names[k])
+            if stats is None:
+                cnt = techniques[k]()
+            else:
+                empty = cells.count(0)
+                count = candidates.count()
+                start = timer()
+                cnt = techniques[k]()
+                elapsed = timer() - start
+                stats.record(names[k], elapsed, count - candidates.count(), empty - cells.count(0))
+            if cnt:
+                progress[names[k]] = progress.get(names[k], 0) + cnt
+                k = 0
+            else:
+                k += 1
+        return progress
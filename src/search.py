@@ -0,0 +1,178 @@
+"""
+    Backtracking search over bitboards, to count the solutions of a grid up to a limit.
+
+    Candidates are 9-bit masks. Before branching, each node places every naked and hidden single, and fails as soon as
+    a cell or a digit of a unit has no place left. It then branches on the empty cell with the fewest candidates, on
+    copies of the grid and candidates. Counting stops as soon as limit solutions are found, so checking that a puzzle
+    is unique is a count to two.
+"""
+
+from operator import itemgetter
+from random import Random
+from typing import List, Sequence, Tuple
+
+from src.candidates import (ALL_CANDIDATES, DIGIT_MASKS, LOWEST_DIGIT,
+                            MASK_DIGITS, POPCOUNT)
+from src.topology import CELL_UNITS, PEERS, UNITS
+
+# Candidates of the cells of each unit, read at once
+UNIT_GETTERS = tuple(itemgetter(*unit) for unit in UNITS)
+# Bits of the 3 units of each cell, in boards of a bit per unit
+CELL_UNIT_BITS = tuple(1 << r | 1 << c | 1 << b for r, c, b in CELL_UNITS)
+ALL_UNITS = (1 << 27) - 1
+
+
+def propagate(grid: List[int], candidates: List[int], pending: List[Tuple[int, int]], dirty: int = ALL_UNITS) -> bool:
+    '''
+        Place the (cell, digit mask) pairs of pending, then every naked and hidden single they lead to, removing each digit
+        from the candidates of the peers of its cell. Return False on a contradiction.
+        Hidden singles are only looked for in the units of dirty (a bit per unit), and in the units changed since.
+    '''
+    peers = PEERS
+    unit_bits = CELL_UNIT_BITS
+    popcount = POPCOUNT
+    while True:
+        while pending:
+            i, bit = pending.pop()
+            if grid[i]:
+                if DIGIT_MASKS[grid[i]] != bit:
+                    return False
+                continue
+            if not candidates[i] & bit:
+                return False
+            grid[i] = LOWEST_DIGIT[bit]
+            candidates[i] = 0
+            dirty |= unit_bits[i]
+            for j in peers[i]:
+                mask = candidates[j]
+                if mask & bit:
+                    mask ^= bit
+                    if not mask:
+                        return False
+                    candidates[j] = mask
+                    dirty |= unit_bits[j]
+                    if popcount[mask] == 1:
+                        pending.append((j, mask))
+
+        # A digit with a single place left in a unit is forced, and a digit with no place left is a dead end
+        units = dirty
+        dirty = 0
+        while units:
+            low = units & -units
+            units ^= low
+            u = low.bit_length() - 1
+            masks = UNIT_GETTERS[u](candidates)
+            m1, m2, m3, m4, m5, m6, m7, m8, m9 = masks
+            # Digits in at least one cell, and in at least two cells, of the unit (unrolled, about twice as fast as a loop)
+            once = m1 | m2
+            twice = m1 & m2
+            twice |= once & m3
+            once |= m3
+            twice |= once & m4
+            once |= m4
+            twice |= once & m5
+            once |= m5
+            twice |= once & m6
+            once |= m6
+            twice |= once & m7
+            once |= m7
+            twice |= once & m8
+            once |= m8
+            twice |= once & m9
+            once |= m9
+            # The empty cells of a unit share the digits it misses, so fewer digits than empty cells leaves one without a place
+            if popcount[once] < 9 - masks.count(0):
+                return False
+            single = once & ~twice
+            if single:
+                for i in UNITS[u]:
+                    mask = candidates[i] & single
+                    if mask:
+                        if popcount[mask] > 1:
+                            return False
+                        pending.append((i, mask))
+        if not pending:
+            return True
+
+
+def count_solutions(cells: Sequence[int], masks: Sequence[int] = None, limit: int = 2, solution: List[int] = None,
+                    rng: Random = None) -> int:
+    '''
+        Count the solutions of a grid, up to limit. Empty cells only take the candidates of masks, if given.
+        The first solution found is written into solution, if given. With rng, digits are tried in random order.
+    '''
+    grid = list(cells)
+    # Digits used by each unit: rows 0-8, columns 9-17 and boxes 18-26
+    used = [0] * 27
+    for i in range(81):
+        if grid[i]:
+            bit = DIGIT_MASKS[grid[i]]
+            r, c, b = CELL_UNITS[i]
+            if (used[r] | used[c] | used[b]) & bit:
+                return 0
+            used[r] |= bit
+            used[c] |= bit
+            used[b] |= bit
+
+    candidates = [0] * 81
+    pending = []
+    for i in range(81):
+        if grid[i] == 0:
+            r, c, b = CELL_UNITS[i]
+            mask = ALL_CANDIDATES & ~(used[r] | used[c] | used[b])
+            if masks is not None:
+                mask &= masks[i]
+            if not mask:
+                return 0
+            candidates[i] = mask
+            if POPCOUNT[mask] == 1:
+                pending.append((i, mask))
+    count = 0
+    popcount = POPCOUNT
+
+    def search(grid: List[int], candidates: List[int], pending: List[Tuple[int, int]], dirty: int) -> bool:
+        '''
+            Propagate the singles, then branch on the empty cell with the fewest candidates, on copies of the grid and
+            candidates. Return True once limit solutions are found.
+        '''
+        nonlocal count
+        if not propagate(grid, candidates, pending, dirty):
+            return False
+        best = -1
+        best_count = 10
+        for i in range(81):
+            mask = candidates[i]
+            if mask and popcount[mask] < best_count:
+                best = i
+                best_count = popcount[mask]
+                if best_count == 2:
+                    break
+        if best < 0:
+            count += 1
+            if count == 1 and solution is not None:
+                solution[:] = grid
+            return count >= limit
+
+        digits = MASK_DIGITS[candidates[best]]
+        if rng is not None:
+            digits = list(digits)
+            rng.shuffle(digits)
+        for d in digits:
+            if search(grid[:], candidates[:], [(best, DIGIT_MASKS[d])], 0):
+                return True
+        return False
+
+    search(grid, candidates, pending, ALL_UNITS)
+    return count
+
+
+def has_other_solution(cells: Sequence[int], i: int, masks: Sequence[int] = None) -> bool:
+    '''
+        Whether the grid, with cell i emptied, has a solution where cell i is not its current digit.
+        This is the uniqueness check of removing a given from a unique puzzle, with a single solution to find.
+    '''
+    allowed = list(masks) if masks is not None else [ALL_CANDIDATES] * 81
+    allowed[i] &= ~DIGIT_MASKS[cells[i]]
+    grid = list(cells)
+    grid[i] = 0
+    return count_solutions(grid, allowed, limit=1) > 0
@@ -0,0 +1,287 @@
+"""
+    Asyncio solving service speaking newline-delimited JSON over TCP or a Unix socket.
+
+    Each request is a JSON object on one line, answered by one line with the same "id":
+        {"id": 1, "puzzle": "<81 digits>", "timeout": 2.5}  ->  {"id": 1, "solution": ..., "solved": ..., "elapsed": ...}
+        {"id": 2, "type": "stats"}                         ->  {"id": 2, "stats": {"queue_depth": ..., "latency": ...}}
+    Failures are answered with {"id": ..., "error": "<message>"}.
+
+    Solve requests go through a bounded queue to a pool of solver processes, and results are written back as they complete,
+    so they may come out of order. When the queue is full the server stops reading from the connection, and the socket
+    buffers push back on the client. A timed out request is answered at its deadline, even while it waits in the queue,
+    and is then never sent to a worker. A puzzle already sent to a worker still runs there after its deadline.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from timeit import default_timer as timer
+from typing import Any, Dict, List, NamedTuple, Sequence, Set
+
+from src.exceptions import InvalidCellValue, InvalidSudoku
+from src.parallel import _init_worker, _solve_chunk
+from src.profiling import percentiles
+from src.scheduler import TECHNIQUES
+from src.util import parse_cells
+
+DEFAULT_QUEUE_SIZE = 256
+LATENCY_WINDOW = 10000
+
+
+class ServiceStats:
+    """
+        Counters of a server, with the latencies of the last LATENCY_WINDOW requests answered.
+    """
+
+    def __init__(self):
+        self.started = timer()
+        self.received = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, error: str = None):
+        self.latencies.append(latency)
+        if error is None:
+            self.completed += 1
+        elif error == 'timeout':
+            self.timeouts += 1
+        else:
+            self.failed += 1
+
+    def as_dict(self, queue_depth: int, in_flight: int) -> Dict[str, Any]:
+        uptime = timer() - self.started
+        return {
+            'uptime': uptime,
+            'received': self.received,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'queue_depth': queue_depth,
+            'in_flight': in_flight,
+            'throughput': self.completed / uptime if uptime > 0 else 0.0,
+            'latency': percentiles(self.latencies),
+        }
+
+
+class Job(NamedTuple):
+    id: Any
+    cells: bytes
+    received: float
+    deadline: float
+    connection: '_Connection'
+    # Set to the answer by a dispatcher, or cancelled at the deadline
+    answer: asyncio.Future
+
+
+class _Connection:
+    """
+        Writer side of a client connection, counting its requests not answered yet.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def add(self):
+        self.pending += 1
+        self.idle.clear()
+
+    async def send(self, message: Dict[str, Any], done: bool = False):
+        async with self.lock:
+            if not self.writer.is_closing():
+                self.writer.write(json.dumps(message).encode() + b'\n')
+                try:
+                    await self.writer.drain()
+                except ConnectionError:
+                    pass
+        if done:
+            self.pending -= 1
+            if self.pending == 0:
+                self.idle.set()
+
+
+class SolveServer:
+    """
+        JSON-lines solving server over a pool of jobs solver processes, with at most queue_size requests waiting.
+        timeout is the default time limit of a request in seconds, from the time it is read (None for no limit).
+    """
+
+    def __init__(self, jobs: int = None, queue_size: int = DEFAULT_QUEUE_SIZE, timeout: float = None,
+                 techniques: Sequence[str] = TECHNIQUES, fallback: str = None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.techniques = tuple(techniques)
+        self.fallback = fallback
+        self.queue_size = queue_size
+        self.stats = ServiceStats()
+        self.in_flight = 0
+        self.queue: asyncio.Queue = None
+        self.executor: ProcessPoolExecutor = None
+        self.server: asyncio.AbstractServer = None
+        self.dispatchers: List[asyncio.Task] = []
+        self.replies: Set[asyncio.Task] = set()
+
+    async def start(self, host: str = None, port: int = 0, path: str = None) -> asyncio.AbstractServer:
+        '''
+            Start the worker pool and listen on a Unix socket at path, or else on TCP host and port (0 for any free port).
+        '''
+        self.queue = asyncio.Queue(self.queue_size)
+        # Forked workers would inherit the sockets of the connections open at the time, and keep them open after they close
+        self.executor = ProcessPoolExecutor(self.jobs, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(self.techniques, self.fallback, False))
+        # Two dispatchers per worker, so a worker gets its next puzzle without waiting for a round trip
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.jobs * 2)]
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    @property
+    def address(self) -> Any:
+        return self.server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        tasks = self.dispatchers + list(self.replies)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def __aenter__(self) -> 'SolveServer':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''
+            Read the requests of a connection until it ends, then wait for its answers before closing it.
+        '''
+        connection = _Connection(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await connection.send({'id': None, 'error': 'bad request: line too long'})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await self.request(connection, line)
+            await connection.idle.wait()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def request(self, connection: _Connection, line: bytes):
+        received = timer()
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError('request must be a JSON object')
+        except ValueError as e:
+            await connection.send({'id': None, 'error': f'bad request: {e}'})
+            return
+        request_id = message.get('id')
+        kind = message.get('type', 'solve')
+        if kind == 'stats':
+            await connection.send({'id': request_id, 'stats': self.stats.as_dict(self.queue.qsize(), self.in_flight)})
+            return
+        if kind != 'solve':
+            await connection.send({'id': request_id, 'error': f'unknown request type {kind!r}'})
+            return
+        try:
+            cells = bytes(parse_cells(message['puzzle']))
+        except (KeyError, TypeError, InvalidSudoku, InvalidCellValue):
+            await connection.send({'id': request_id, 'error': 'puzzle must be 81 digits'})
+            return
+        timeout = message.get('timeout', self.timeout)
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            await connection.send({'id': request_id, 'error': 'timeout must be a number of seconds'})
+            return
+        deadline = received + timeout if timeout is not None else None
+        self.stats.received += 1
+        connection.add()
+        job = Job(request_id, cells, received, deadline, connection, asyncio.get_running_loop().create_future())
+        # The deadline runs from now, so it also covers the time spent waiting for a place in the queue
+        reply = asyncio.create_task(self.reply(job))
+        self.replies.add(reply)
+        reply.add_done_callback(self.replies.discard)
+        # Blocks while the queue is full, which stops reading from this connection
+        await self.queue.put(job)
+
+    async def reply(self, job: Job):
+        '''
+            Send the answer of a job when a dispatcher sets it, or a timeout error at its deadline.
+        '''
+        try:
+            if job.deadline is None:
+                response = await job.answer
+            else:
+                # Cancels the answer at the deadline, so the dispatchers skip the job if it is still queued
+                response = await asyncio.wait_for(job.answer, max(0.0, job.deadline - timer()))
+        except asyncio.TimeoutError:
+            response = {'id': job.id, 'error': 'timeout'}
+        self.stats.record(timer() - job.received, response.get('error'))
+        await job.connection.send(response, done=True)
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.answer.done():
+                    continue
+                self.in_flight += 1
+                try:
+                    response = await self.solve(loop, job)
+                finally:
+                    self.in_flight -= 1
+                if not job.answer.done():
+                    job.answer.set_result(response)
+            finally:
+                self.queue.task_done()
+
+    async def solve(self, loop: asyncio.AbstractEventLoop, job: Job) -> Dict[str, Any]:
+        try:
+            results, _ = await loop.run_in_executor(self.executor, _solve_chunk, job.cells)
+        except BrokenProcessPool:
+            return {'id': job.id, 'error': 'worker pool is broken'}
+        except Exception as e:
+            return {'id': job.id, 'error': f'solver failed: {e!r}'}
+        result = results[0]
+        return {'id': job.id, 'solution': result.solution, 'solved': result.solved, 'cells_solved': result.cells_solved,
+                'elapsed': result.elapsed, 'techniques': result.techniques}
+
+
+async def serve(host: str = None, port: int = 0, path: str = None, jobs: int = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                timeout: float = None, techniques: Sequence[str] = TECHNIQUES, fallback: str = None):
+    '''
+        Run a SolveServer until cancelled.
+    '''
+    async with SolveServer(jobs, queue_size, timeout, techniques, fallback) as server:
+        await server.start(host, port, path)
+        await server.serve_forever()
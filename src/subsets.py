@@ -0,0 +1,91 @@
+"""
+    Naked and hidden subsets (pairs, triples and quads) of a unit, found over bitmasks.
+
+    Naked subsets combine the candidate masks of the cells, hidden subsets the position masks of the digits
+    (bit k set if the digit is a candidate of the k-th empty cell of the unit). Both look for k masks whose union has k bits:
+    combinations are grown one member at a time and dropped as soon as their union has more than max_size bits.
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+from src.candidates import (ALL_CANDIDATES, DIGIT_MASKS, MASK_DIGITS, POPCOUNT,
+                            Elimination)
+from src.topology import Cells
+
+MAX_SUBSET_SIZE = 4
+
+
+def locked_sets(bits: Sequence[int], max_size: int) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    '''
+        Yield the union and the indices of each combination of 2 to max_size (at most 4) masks whose union has as many bits as masks.
+        A locked set is not extended further, since its supersets add nothing.
+    '''
+    n = len(bits)
+    for a in range(n):
+        ma = bits[a]
+        for b in range(a + 1, n):
+            mb = ma | bits[b]
+            nb = POPCOUNT[mb]
+            if nb > max_size:
+                continue
+            if nb <= 2:
+                if nb == 2:
+                    yield mb, (a, b)
+                continue
+            for c in range(b + 1, n):
+                mc = mb | bits[c]
+                nc = POPCOUNT[mc]
+                if nc > max_size:
+                    continue
+                if nc <= 3:
+                    if nc == 3:
+                        yield mc, (a, b, c)
+                    continue
+                for d in range(c + 1, n):
+                    md = mc | bits[d]
+                    if POPCOUNT[md] == 4:
+                        yield md, (a, b, c, d)
+
+
+def find_naked_subsets(masks: Sequence[int], unit: Cells, max_size: int = MAX_SUBSET_SIZE) -> List[Elimination]:
+    '''
+        Sets of k cells of the unit with k candidates in all: the candidates are removed from the other cells of the unit.
+    '''
+    cells = [i for i in unit if masks[i]]
+    max_size = min(max_size, len(cells) - 1)
+    pool = [i for i in cells if 2 <= POPCOUNT[masks[i]] <= max_size]
+    if len(pool) < 2:
+        return []
+    eliminations = []
+    for mask, members in locked_sets([masks[i] for i in pool], max_size):
+        subset = tuple(pool[k] for k in members)
+        others = tuple(j for j in cells if masks[j] & mask and j not in subset)
+        if others:
+            eliminations.append(Elimination(others, mask, subset))
+    return eliminations
+
+
+def find_hidden_subsets(masks: Sequence[int], unit: Cells, max_size: int = MAX_SUBSET_SIZE) -> List[Elimination]:
+    '''
+        Sets of k digits that are candidates of only k cells of the unit: the other candidates are removed from those cells.
+    '''
+    cells = [i for i in unit if masks[i]]
+    max_size = min(max_size, len(cells) - 1)
+    positions = [0] * 10
+    for k, i in enumerate(cells):
+        for d in MASK_DIGITS[masks[i]]:
+            positions[d] |= 1 << k
+    pool = [d for d in range(1, 10) if 1 <= POPCOUNT[positions[d]] <= max_size]
+    if len(pool) < 2:
+        return []
+    eliminations = []
+    for places, members in locked_sets([positions[d] for d in pool], max_size):
+        mask = 0
+        for k in members:
+            mask |= DIGIT_MASKS[pool[k]]
+        subset = tuple(cells[j] for j in range(len(cells)) if places >> j & 1)
+        others = ALL_CANDIDATES & ~mask
+        targets = tuple(i for i in subset if masks[i] & others)
+        if targets:
+            eliminations.append(Elimination(targets, others, subset))
+    return eliminations
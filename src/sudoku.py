@@ -1,19 +1,46 @@
 from __future__ import annotations
 
-from itertools import combinations, product
+from itertools import combinations
 from timeit import default_timer as timer
-from typing import Dict, Iterable, List, Set
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple
 
+from src.candidates import *
+from src.chains import (MAX_CHAIN_LENGTH, LinkGraph, find_chains,
+                        find_coloring, link_graph)
+from src.dlx import solve_exact_cover
 from src.exceptions import InvalidCellValue, InvalidSudoku
+from src.fish import find_fish, line_index
+from src.profiling import TechniqueStats
+from src.scheduler import ELIMINATION_TECHNIQUES, Scheduler
+from src.search import count_solutions
+from src.subsets import find_hidden_subsets, find_naked_subsets
+from src.trace import ELIMINATE, PLACE, Trace
 from src.util import *
+from src.wings import (find_w_wings, find_wxyz_wings, find_xyz_wings,
+                       find_y_wings, link_index, value_index)
+
+FALLBACKS = ('dlx',)
+
+
+class Checkpoint(NamedTuple):
+    cells: int
+    candidates: int
+    computed: bool
 
 
 class Sudoku:
+    scheduler = Scheduler()
+
     def __init__(self, cells: List[int] = None, name: str = "Sudoku"):
         if cells is None:
             cells = [0] * 81
         self.set_cells(cells)
-        self.candidates = [set() for _ in range(81)]
+        self.candidates = Candidates()
+        self.techniques_used: Dict[str, int] = {}
+        self.phases: Dict[str, int] = {}
+        self.stats: TechniqueStats = None
+        self.trace: Trace = None
+        self.trail: List[int] = None
         self.name = name
 
     def get_cell(self, r: int, c: int) -> int:
@@ -28,14 +55,128 @@ class Sudoku:
                 raise InvalidCellValue()
 
         self.cells = cells
+        self.count_digits()
+        # Whether the candidates of all the cells have been computed from these cells
+        self.candidates_computed = False
 
-    def place_cell(self, i: int, value: int):
+    def count_digits(self):
+        '''
+            Rebuild the digit masks and counts of the units from the cells.
+            The cells must then only be changed through place_cell, unset_cell or rollback, which keep them up to date.
+        '''
+        # Digits placed in each unit, as masks and as counts indexed by unit * 10 + digit
+        self.occupied = [0] * 27
+        self.digit_counts = [0] * 270
+        # Number of (unit, digit) pairs placed more than once, and number of filled cells
+        self.conflicts = 0
+        self.filled = 0
+        for i in range(81):
+            if self.cells[i] != 0:
+                self.add_digit(i, self.cells[i])
+
+    def add_digit(self, i: int, value: int):
+        counts = self.digit_counts
+        for u in CELL_UNITS[i]:
+            k = u * 10 + value
+            counts[k] += 1
+            if counts[k] == 1:
+                self.occupied[u] |= DIGIT_MASKS[value]
+            elif counts[k] == 2:
+                self.conflicts += 1
+        self.filled += 1
+
+    def remove_digit(self, i: int, value: int):
+        counts = self.digit_counts
+        for u in CELL_UNITS[i]:
+            k = u * 10 + value
+            counts[k] -= 1
+            if counts[k] == 0:
+                self.occupied[u] &= ~DIGIT_MASKS[value]
+            elif counts[k] == 1:
+                self.conflicts -= 1
+        self.filled -= 1
+
+    def write_cell(self, i: int, value: int):
+        '''
+            Change the value of a cell, keeping the digit masks and counts of its units up to date.
+        '''
+        previous = self.cells[i]
+        if previous != 0:
+            self.remove_digit(i, previous)
         self.cells[i] = value
-        self.candidates[i] = set()
-        self.eliminate_candidates(value, i)
+        if value != 0:
+            self.add_digit(i, value)
+
+    def reset(self, cells: List[int]):
+        '''
+            Load new cells, reusing the cell list and the candidate store of this Sudoku.
+        '''
+        if len(cells) != 81:
+            raise InvalidSudoku()
+
+        for cell in cells:
+            if not valid_cell_value(cell):
+                raise InvalidCellValue()
+
+        self.release()
+        self.cells[:] = cells
+        self.count_digits()
+        self.candidates.clear()
+        self.candidates_computed = False
+        self.techniques_used = {}
+        self.phases = {}
+
+    def place_cell(self, i: int, value: int, reasons: Cells = ()):
+        if self.trail is not None:
+            self.trail.append(i << 4 | self.cells[i])
+        self.write_cell(i, value)
+        self.candidates.set_mask(i, 0)
+        # Removing the digit from the peers follows from the placement, so it is not traced
+        self.candidates.eliminate(PEERS[i], DIGIT_MASKS[value])
+        if self.trace is not None:
+            self.trace.record(PLACE, i, value, tuple(reasons))
 
     def unset_cell(self, r: int, c: int):
-        self.set_cell(r, c, 0)
+        '''
+            Empty a cell. All the candidates are computed again from the cells: the removed digit may be possible again,
+            and so may any elimination that followed from it, anywhere on the grid.
+        '''
+        i = cell_index(r, c)
+        if self.cells[i] == 0:
+            return
+        if self.trail is not None:
+            self.trail.append(i << 4 | self.cells[i])
+        self.write_cell(i, 0)
+        self.compute_candidates()
+        self.candidates.forget_changes()
+
+    def checkpoint(self) -> Checkpoint:
+        '''
+            Start recording the changes to the cells and candidates, and mark the current state.
+        '''
+        if self.trail is None:
+            self.trail = []
+        return Checkpoint(len(self.trail), self.candidates.checkpoint(), self.candidates_computed)
+
+    def rollback(self, checkpoint: Checkpoint):
+        '''
+            Restore the cells and candidates of a checkpoint, undoing only the changes made since.
+        '''
+        trail = self.trail
+        if trail is None or checkpoint.cells > len(trail):
+            raise ValueError(f'Invalid checkpoint: {checkpoint}')
+        self.candidates.rollback(checkpoint.candidates)
+        self.candidates_computed = checkpoint.computed
+        while len(trail) > checkpoint.cells:
+            entry = trail.pop()
+            self.write_cell(entry >> 4, entry & 15)
+
+    def release(self):
+        '''
+            Stop recording the changes to the cells and candidates, as Candidates.release.
+        '''
+        self.trail = None
+        self.candidates.release()
 
     def row(self, r: int) -> List[int]:
         return self.cells[r * 9:r * 9 + 9]
@@ -44,101 +185,114 @@ class Sudoku:
         return self.cells[c::9]
 
     def box(self, n: int) -> List[int]:
-        block_r = n // 3
-        block_c = n % 3
-        c_start = block_c * 3
-        c_end = c_start + 3
-        cells = []
-        for r in range(block_r * 3, block_r * 3 + 3):
-            cells.extend(self.row(r)[c_start:c_end])
-        return cells
+        cells = self.cells
+        return [cells[i] for i in BOXES[n]]
 
     def eliminate_candidates(self, value: int, i: int = None, r: int = None, c: int = None, b: int = None) -> int:
         if value == 0:
             return 0
         cnt = 0
         if i is not None:
-            r, c, b = position(i)
+            # The row, column and box of the cell, including the cell itself
+            return self.eliminate_candidates_of_indices((i,) + PEERS[i], value)
         if r is not None:
-            cnt += self.eliminate_candidates_of_indices(row_indices(r), value)
+            cnt += self.eliminate_candidates_of_indices(ROWS[r], value)
         if c is not None:
-            cnt += self.eliminate_candidates_of_indices(
-                column_indices(c), value)
+            cnt += self.eliminate_candidates_of_indices(COLUMNS[c], value)
         if b is not None:
-            cnt += self.eliminate_candidates_of_indices(box_indices(b), value)
+            cnt += self.eliminate_candidates_of_indices(BOXES[b], value)
         return cnt
 
-    def eliminate_candidates_of_indices(self, indices: Iterable[int], value: int) -> int:
+    def eliminate_candidates_of_indices(self, indices: Iterable[int], value: int, reasons: Cells = ()) -> int:
+        return self.eliminate_mask_of_indices(indices, DIGIT_MASKS[value], reasons)
+
+    def eliminate_mask_of_indices(self, indices: Iterable[int], mask: int, reasons: Cells = ()) -> int:
+        '''
+            Candidates.eliminate, recording each removal in the trace with the cells in reasons that justify it.
+        '''
+        if self.trace is None:
+            return self.candidates.eliminate(indices, mask)
+        masks = self.candidates.masks
+        reasons = tuple(reasons)
         cnt = 0
         for i in indices:
-            if value in self.candidates[i]:
-                self.candidates[i].remove(value)
-                cnt += 1
+            removed = masks[i] & mask
+            if removed:
+                cnt += self.candidates.eliminate((i,), removed)
+                self.trace.record(ELIMINATE, i, removed, reasons)
         return cnt
 
-    def compute_candidates(self, i: int = None) -> Set[int]:
+    def compute_candidates(self, i: int = None) -> FrozenSet[int]:
+        masks = self.candidates.masks
         if i is None:
+            used = self.occupied
+            self.candidates.save_all()
             for i in range(81):
-                self.compute_candidates(i)
+                if self.cells[i] != 0:
+                    masks[i] = 0
+                    continue
+                r, c, b = CELL_UNITS[i]
+                masks[i] = ALL_CANDIDATES & ~(used[r] | used[c] | used[b])
+            self.candidates.touch_all()
+            self.candidates_computed = True
             return
-        r, c, b = position(i)
         if self.cells[i] != 0:
             return
-        row = set(self.row(r))
-        column = set(self.column(c))
-        box = set(self.box(b))
-        candidates = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        candidates = candidates - row - column - box
-        self.candidates[i] = candidates
-        return candidates
+        used = self.occupied
+        r, c, b = CELL_UNITS[i]
+        self.candidates.set_mask(i, ALL_CANDIDATES & ~(used[r] | used[c] | used[b]))
+        return self.candidates[i]
 
     def solve_hidden_singles(self) -> int:
         '''
             Solve hidden singles in row, column and box. Repeat until no more hidden singles are found.
         '''
 
-        def solve_hidden_singles_of_indices(indices: List[str]) -> int:
+        def solve_hidden_singles_of_indices(indices: Cells) -> int:
             '''
                 Find a cell with unique candidate in a list of cells.
             '''
-            candidates_sets: List[Set[int]] = [self.candidates[i]
-                                               for i in indices if len(self.candidates[i]) >= 1]
+            masks = self.candidates.masks
+            seen_once = 0
+            seen_twice = 0
+            for i in indices:
+                seen_twice |= seen_once & masks[i]
+                seen_once |= masks[i]
 
-            if len(candidates_sets) == 0:
+            if seen_once == 0:
                 return 0
 
+            unique_candidates = seen_once & ~seen_twice
             cnt = 0
             for i in indices:
-                candidates = set(self.candidates[i])
+                candidates = masks[i]
 
                 # Check if it has a unique candidate in the area
-                if len(candidates) > 1:
-                    other_sets = [s for s in candidates_sets if s is not self.candidates[i]] or [set()]
-                    other_candidates = set.union(*other_sets)
-                    candidates -= other_candidates
+                if POPCOUNT[candidates] > 1:
+                    candidates &= unique_candidates
 
                 # If it has a unique candidate, place it
-                if len(candidates) == 1:
+                if POPCOUNT[candidates] == 1:
                     cnt += 1
-                    self.place_cell(i, candidates.pop())
+                    self.place_cell(i, LOWEST_DIGIT[candidates], indices)
             return cnt
 
         cnt = 0
-        for i in range(9):
-            cnt += solve_hidden_singles_of_indices(box_indices(i))
-            cnt += solve_hidden_singles_of_indices(row_indices(i))
-            cnt += solve_hidden_singles_of_indices(column_indices(i))
-
-        if cnt > 0:
-            cnt += self.solve_hidden_singles()
-
-        return cnt
+        while True:
+            found = 0
+            for i in range(9):
+                found += solve_hidden_singles_of_indices(BOXES[i])
+                found += solve_hidden_singles_of_indices(ROWS[i])
+                found += solve_hidden_singles_of_indices(COLUMNS[i])
+            if found == 0:
+                return cnt
+            cnt += found
 
     def count_candidates(self, indices: Iterable[int]) -> Dict[int, int]:
         d = {}
-        sets = [self.candidates[i] for i in indices]
-        for s in sets:
-            for n in s:
+        masks = self.candidates.masks
+        for i in indices:
+            for n in MASK_DIGITS[masks[i]]:
                 d[n] = d.get(n, 0) + 1
         return d
 
@@ -150,33 +304,24 @@ class Sudoku:
             Same applied for rows.
         """
         cnt = 0
+        candidates = self.candidates
+        dirty = candidates.changed_units('pointing_pair')
         for b in range(9):
-            bi = box_indices(b)
-            box_candidates_count = self.count_candidates(bi)
+            # The pointing candidates only depend on the box
+            if not dirty[18 + b]:
+                continue
 
             # Scan rows in box
             for br in range(3):
-                rbi = query_indices(r=br, b=b)
-                r = b // 3 * 3 + br
-                ri = row_indices(r=r)
-                rb_candidates_count = self.count_candidates(rbi)
-                other_rb_indices = list(set(ri) - set(rbi))
-                for k, v in rb_candidates_count.items():
-                    if box_candidates_count[k] == v:
-                        cnt += self.eliminate_candidates_of_indices(
-                            other_rb_indices, k)
+                pointing = candidates.union(MINI_ROWS[b][br]) & ~candidates.union(MINI_ROW_REST_OF_BOX[b][br])
+                if pointing:
+                    cnt += self.eliminate_mask_of_indices(MINI_ROW_REST_OF_LINE[b][br], pointing, MINI_ROWS[b][br])
 
             # Scan columns in box
             for bc in range(3):
-                cbi = query_indices(c=bc, b=b)
-                c = b % 3 * 3 + bc
-                ci = column_indices(c=c)
-                cb_candidates_count = self.count_candidates(cbi)
-                other_cb_indices = list(set(ci) - set(cbi))
-                for k, v in cb_candidates_count.items():
-                    if box_candidates_count[k] == v:
-                        cnt += self.eliminate_candidates_of_indices(
-                            other_cb_indices, k)
+                pointing = candidates.union(MINI_COLUMNS[b][bc]) & ~candidates.union(MINI_COLUMN_REST_OF_BOX[b][bc])
+                if pointing:
+                    cnt += self.eliminate_mask_of_indices(MINI_COLUMN_REST_OF_LINE[b][bc], pointing, MINI_COLUMNS[b][bc])
         return cnt
 
     def box_line_reduction(self) -> int:
@@ -186,36 +331,23 @@ class Sudoku:
             Same applied for each row.
         """
         cnt = 0
-        for r in range(9):
-            candidate_counts = self.count_candidates(row_indices(r))
-            for k, v in candidate_counts.items():
-                if v not in (2, 3):
+        candidates = self.candidates
+        dirty = candidates.changed_units('box_line_reduction')
+        for b in range(9):
+            for br in range(3):
+                # The confined candidates only depend on the line
+                if not dirty[b // 3 * 3 + br]:
                     continue
-                _indices = set(i for i in row_indices(
-                    r) if k in self.candidates[i])
+                confined = candidates.union(MINI_ROWS[b][br]) & ~candidates.union(MINI_ROW_REST_OF_LINE[b][br])
+                if confined:
+                    cnt += self.eliminate_mask_of_indices(MINI_ROW_REST_OF_BOX[b][br], confined, MINI_ROWS[b][br])
 
-                _positions = [position(i) for i in _indices]
-                _boxes = set(p[2] for p in _positions)
-                if len(_boxes) != 1:
-                    continue
-                b = _boxes.pop()
-                bi = set(box_indices(b)) - _indices
-                cnt += self.eliminate_candidates_of_indices(bi, k)
-
-        for c in range(9):
-            candidate_counts = self.count_candidates(column_indices(c))
-            for k, v in candidate_counts.items():
-                if v not in (2, 3):
-                    continue
-                _indices = set(i for i in column_indices(
-                    c) if k in self.candidates[i])
-                _positions = [position(i) for i in _indices]
-                _boxes = set(p[2] for p in _positions)
-                if len(_boxes) != 1:
+            for bc in range(3):
+                if not dirty[9 + b % 3 * 3 + bc]:
                     continue
-                b = _boxes.pop()
-                bi = set(box_indices(b)) - _indices
-                cnt += self.eliminate_candidates_of_indices(bi, k)
+                confined = candidates.union(MINI_COLUMNS[b][bc]) & ~candidates.union(MINI_COLUMN_REST_OF_LINE[b][bc])
+                if confined:
+                    cnt += self.eliminate_mask_of_indices(MINI_COLUMN_REST_OF_BOX[b][bc], confined, MINI_COLUMNS[b][bc])
 
         return cnt
 
@@ -223,72 +355,60 @@ class Sudoku:
         """
             For each 2 boxes in same direction, if they have a candidate only lies within 2 rows (or columns), remove candidates of that number from 2 rows in the other box.
         """
+        masks = self.candidates.masks
+        dirty = self.candidates.changed_units('box_box_reduction')
         cnt = 0
         for x in range(1, 10):
+            bit = DIGIT_MASKS[x]
+            # Rows (and columns) of each box that have x as a candidate, as 3-bit masks relative to the box
+            box_rows = [0] * 9
+            box_columns = [0] * 9
+            for i in range(81):
+                if masks[i] & bit:
+                    r, c, b = POSITIONS[i]
+                    box_rows[b] |= 1 << (r % 3)
+                    box_columns[b] |= 1 << (c % 3)
+
             # Check horizontal boxes
-            for k in range(3):
-                boxes = set(k * 3 + i for i in range(3))
-                pairs = [set(pair) for pair in combinations(boxes, 2)]
-                for pair in pairs:
-                    b1, b2 = pair
-                    rb1 = set(row_of(i) for i in box_indices(b1) if x in self.candidates[i])
-                    rb2 = set(row_of(i) for i in box_indices(b2) if x in self.candidates[i])
-                    rows = rb1 | rb2
-                    if len(rb1) == 0 or len(rb2) == 0 or len(rows) != 2:
+            for boxes in BAND_BOXES:
+                for b1, b2 in combinations(boxes, 2):
+                    if not (dirty[18 + b1] or dirty[18 + b2]):
+                        continue
+                    other_box_i = sum(boxes) - b1 - b2
+                    rows = box_rows[b1] | box_rows[b2]
+                    if box_rows[b1] == 0 or box_rows[b2] == 0 or POPCOUNT[rows] != 2:
                         continue
-                    other_box_i = (boxes - pair).pop()
-                    indices = [i for i in box_indices(other_box_i) if row_of(i) in rb1]
-                    cnt += self.eliminate_candidates_of_indices(indices, x)
+                    reasons = [i for i in BOXES[b1] + BOXES[b2] if masks[i] & bit]
+                    for br in MASK_DIGITS[rows]:
+                        cnt += self.eliminate_mask_of_indices(MINI_ROWS[other_box_i][br - 1], bit, reasons)
 
             # Check vertical boxes
-            for k in range(3):
-                boxes = set(k + i * 3 for i in range(3))
-                pairs = [set(pair) for pair in combinations(boxes, 2)]
-                for pair in pairs:
-                    b1, b2 = pair
-                    cb1 = set(column_of(i) for i in box_indices(b1) if x in self.candidates[i])
-                    cb2 = set(column_of(i) for i in box_indices(b2) if x in self.candidates[i])
-                    columns = cb1 | cb2
-                    if len(cb1) == 0 or len(cb2) == 0 or len(columns) != 2:
+            for boxes in STACK_BOXES:
+                for b1, b2 in combinations(boxes, 2):
+                    if not (dirty[18 + b1] or dirty[18 + b2]):
                         continue
-
-                    other_box_i = (boxes - pair).pop()
-                    indices = [i for i in box_indices(other_box_i) if column_of(i) in columns]
-                    cnt += self.eliminate_candidates_of_indices(indices, x)
+                    other_box_i = sum(boxes) - b1 - b2
+                    columns = box_columns[b1] | box_columns[b2]
+                    if box_columns[b1] == 0 or box_columns[b2] == 0 or POPCOUNT[columns] != 2:
+                        continue
+                    reasons = [i for i in BOXES[b1] + BOXES[b2] if masks[i] & bit]
+                    for bc in MASK_DIGITS[columns]:
+                        cnt += self.eliminate_mask_of_indices(MINI_COLUMNS[other_box_i][bc - 1], bit, reasons)
 
         return cnt
 
     def hidden_subsets(self) -> int:
         """
-            For each area (box, column or row), check for each subset of size k from 2 to 4, if it has k candidates that do not belong other cells in the area,
-            eliminate all other candidates that are belong to other cells in the area.
+            For each area (box, column or row), check for k digits from 2 to 4 that are candidates of only k cells of the area,
+            then eliminate the other candidates of those cells.
         """
-        def eliminate_hidden_subsets_of_indices(indices: List[str]) -> int:
-            cnt = 0
-            for size in range(2, min(4, len(indices))):
-                indices_subsets = list(combinations(indices, size))
-                for subset_indices in indices_subsets:
-                    subset_candidates = set.union(
-                        *[self.candidates[i] for i in subset_indices])
-                    other_indices = list(set(indices) - set(subset_indices))
-                    other_candidates = set.union(
-                        *[self.candidates[i] for i in other_indices])
-                    subset_unique_candidates = subset_candidates - other_candidates
-                    # If the subset (size k) has k candidates that does not belong to other cells, eliminate other candidates in the subset that belong to other cells.
-                    if len(subset_unique_candidates) == size:
-                        for candidate in other_candidates:
-                            cnt += self.eliminate_candidates_of_indices(
-                                subset_indices, candidate)
-            return cnt
-
         cnt = 0
-        for x in range(9):
-            bi = [i for i in box_indices(x) if self.cells[i] == 0]
-            ri = [i for i in row_indices(x) if self.cells[i] == 0]
-            ci = [i for i in column_indices(x) if self.cells[i] == 0]
-            cnt += eliminate_hidden_subsets_of_indices(bi)
-            cnt += eliminate_hidden_subsets_of_indices(ri)
-            cnt += eliminate_hidden_subsets_of_indices(ci)
+        masks = self.candidates.masks
+        dirty = self.candidates.changed_units('hidden_subsets')
+        for u, unit in enumerate(UNITS):
+            if dirty[u]:
+                for elimination in find_hidden_subsets(masks, unit):
+                    cnt += self.eliminate_mask_of_indices(*elimination)
 
         return cnt
 
@@ -296,29 +416,13 @@ class Sudoku:
         """
             For each area (box, column or row), check for naked subset of size k from 2 to 4. If it has k candidates, then eliminate those candidates from other cells in the area.
         """
-        def eliminate_naked_subsets_of_indices(indices: List[str]):
-            cnt = 0
-            for size in range(2, min(4, len(indices))):
-                indices_subsets = list(combinations(indices, size))
-                for subset_indices in indices_subsets:
-                    subset_candidates = set.union(
-                        *[self.candidates[i] for i in subset_indices])
-                    if len(subset_candidates) == size:
-                        other_indices = list(
-                            set(indices) - set(subset_indices))
-                        for candidate in subset_candidates:
-                            cnt += self.eliminate_candidates_of_indices(
-                                other_indices, candidate)
-            return cnt
-
         cnt = 0
-        for x in range(9):
-            bi = [i for i in box_indices(x) if self.cells[i] == 0]
-            ri = [i for i in row_indices(x) if self.cells[i] == 0]
-            ci = [i for i in column_indices(x) if self.cells[i] == 0]
-            cnt += eliminate_naked_subsets_of_indices(bi)
-            cnt += eliminate_naked_subsets_of_indices(ri)
-            cnt += eliminate_naked_subsets_of_indices(ci)
+        masks = self.candidates.masks
+        dirty = self.candidates.changed_units('naked_subsets')
+        for u, unit in enumerate(UNITS):
+            if dirty[u]:
+                for elimination in find_naked_subsets(masks, unit):
+                    cnt += self.eliminate_mask_of_indices(*elimination)
 
         return cnt
 
@@ -326,159 +430,35 @@ class Sudoku:
         """
             Detect x-wing in row or column then eliminate that candidate from intersecting cells.
         """
-        cnt = 0
-        # Detect x-wing in rows
-        for x in range(1, 10):
-            valid_rows = []
+        return self.fish(n)
 
-            for r in range(9):
-                candidate_counts = self.count_candidates(row_indices(r))
-                if not 2 <= candidate_counts.get(x, 0) <= n:
-                    continue
-                valid_rows.append(r)
-
-            if len(valid_rows) < n:
-                continue
-
-            combs = list(combinations(valid_rows, n))
-
-            for rows in combs:
-                indices = set()
-                for r in rows:
-                    ri = set(i for i in row_indices(r) if x in self.candidates[i])
-                    indices.update(ri)
-                columns = set(column_of(i) for i in indices)
-                if len(columns) == n:
-                    for c in columns:
-                        _ci = set(i for i in column_indices(c) if row_of(i) not in rows)
-                        cnt += self.eliminate_candidates_of_indices(_ci, x)
-
-        # Detect x-wing in columns
+    def fish(self, n: int, finned: bool = False) -> int:
+        """
+            For each digit, find n rows whose candidates lie in n columns (or the other way around) through the line index
+            of the candidates, then eliminate that digit from the rest of those columns. With finned, find the fish with
+            fins in one box instead, and only eliminate inside that box.
+        """
+        index = self.candidates.cached('line_index', line_index)
+        # A fish only depends on its base lines, so at least one of them must have changed
+        dirty = self.candidates.changed_units(('fish', n, finned))
+        cnt = 0
         for x in range(1, 10):
-            valid_columns = []
-
-            for c in range(9):
-                candidate_counts = self.count_candidates(column_indices(c))
-                if not 2 <= candidate_counts.get(x, 0) <= n:
-                    continue
-                valid_columns.append(c)
-
-            if len(valid_columns) < n:
-                continue
-
-            combs = list(combinations(valid_columns, n))
-
-            for columns in combs:
-                indices = set()
-                for c in columns:
-                    ci = set(i for i in column_indices(c) if x in self.candidates[i])
-                    indices.update(ci)
-                rows = set(row_of(i) for i in indices)
-                if len(rows) == n:
-                    for r in rows:
-                        _ri = set(i for i in row_indices(r) if column_of(i) not in columns)
-                        cnt += self.eliminate_candidates_of_indices(_ri, x)
+            rows = index.rows[x]
+            for fish in find_fish(rows, n, finned, dirty[:9]):
+                base = [r * 9 + c for r in fish.base for c in range(9) if rows[r] >> c & 1]
+                cnt += self.eliminate_candidates_of_indices([r * 9 + c for r, c in fish.targets], x, base)
+
+            columns = index.columns[x]
+            for fish in find_fish(columns, n, finned, dirty[9:18]):
+                base = [r * 9 + c for c in fish.base for r in range(9) if columns[c] >> r & 1]
+                cnt += self.eliminate_candidates_of_indices([r * 9 + c for c, r in fish.targets], x, base)
         return cnt
 
     def y_wing(self) -> int:
-        cnt = 0
-        for i in range(81):
-            if self.cells[i] != 0:
-                continue
-            candidates = self.candidates[i]
-            if len(candidates) != 2:
-                continue
-            # Assume that current cell is pivot of y-wing
-            r, c, b = position(i)
-
-            pincers_column = []
-            pincers_row = []
-            pincers_box = []
-
-            # Check for pincers in column
-            for _r in range(0, 9):
-                _i = cell_index(_r, c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if b == _b:
-                    continue
-                if len(_candidates) != 2:
-                    continue
-                # Take if there is one candidate in common
-                if len(_candidates & candidates) == 1:
-                    pincers_column.append(_i)
-
-            # Check for pincers in row
-            for _c in range(0, 9):
-                _i = cell_index(r, _c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if b == _b:
-                    continue
-                if len(_candidates) != 2:
-                    continue
-                # Take if there is one candidate in common
-                if len(_candidates & candidates) == 1:
-                    pincers_row.append(_i)
-
-            # Check for pincers in box
-            for _r in range(r // 3 * 3, r // 3 * 3 + 3):
-                for _c in range(c // 3 * 3, c // 3 * 3 + 3):
-                    # Skip if the two cells are in the same column or row
-                    if _r == r or _c == c:
-                        continue
-
-                    _i = cell_index(_r, _c)
-                    _candidates = self.candidates[_i]
-                    if len(_candidates) != 2:
-                        continue
-                    # Take if there is one candidate in common
-                    if len(_candidates & candidates) == 1:
-                        pincers_box.append(_i)
-
-            pincers_rc = product(pincers_column, pincers_row)
-            pincers_rb = product(pincers_row, pincers_box)
-            pincers_cb = product(pincers_column, pincers_box)
-
-            cnt = 0
-
-            for i1, i2 in pincers_rc:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
-                    candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
-                    # Intersect positions of pincers
-                    r1, c1, _ = position(i1)
-                    r2, c2, _ = position(i2)
-                    cnt += self.eliminate_candidates_of_indices(
-                        [cell_index(r1, c2), cell_index(r2, c1)], candidate_to_eliminiate)
-
-            for i1, i2 in pincers_rb:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
-                    candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
-                    r1, _, b1 = position(i1)
-                    r2, _, b2 = position(i2)
-                    # Remove candidates from the same row of the other pincer box.
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(r=r1 % 3, b=b2)) | set(
-                            query_indices(r=r2 % 3, b=b1)),
-                        candidate_to_eliminiate
-                    )
-
-            for i1, i2 in pincers_cb:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
-                    candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
-                    _, c1, b1 = position(i1)
-                    _, c2, b2 = position(i2)
-                    # Remove candidates from the same column of the other pincer box.
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(c=c1 % 3, b=b2)) | set(
-                            query_indices(c=c2 % 3, b=b1)),
-                        candidate_to_eliminiate
-                    )
-
-        return cnt
+        """
+            A bivalue pivot xy seeing bivalue pincers xz and yz: eliminate z from the cells seeing both pincers.
+        """
+        return self.apply_wings(find_y_wings)
 
     def swordfish(self) -> int:
         """
@@ -492,122 +472,143 @@ class Sudoku:
         """
         return self.x_wing(4)
 
+    def finned_x_wing(self) -> int:
+        """
+            X-Wing with extra candidates (fins) in one box, including sashimi X-Wings.
+        """
+        return self.fish(2, finned=True)
+
+    def finned_swordfish(self) -> int:
+        return self.fish(3, finned=True)
+
+    def finned_jellyfish(self) -> int:
+        return self.fish(4, finned=True)
+
     def xyz_wing(self) -> int:
-        cnt = 0
-        for i in range(81):
-            if self.cells[i] != 0:
-                continue
-            candidates = self.candidates[i]
-            if len(candidates) != 3:
-                continue
-            # Assume that current cell is pivot of xyz-wing
-            r, c, b = position(i)
-
-            pincers_column = []
-            pincers_row = []
-            pincers_box = []
-
-            # Check for pincers in column
-            for _r in range(0, 9):
-                _i = cell_index(_r, c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if _b == b:
-                    continue
-                if len(_candidates) != 2:
-                    continue
-                # Take if there is two candidates in common
-                if len(_candidates & candidates) == 2:
-                    pincers_column.append(_i)
-
-            # Check for pincers in row
-            for _c in range(0, 9):
-                _i = cell_index(r, _c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if _b == b:
-                    continue
-                if len(_candidates) != 2:
-                    continue
-                # Take if there is two candidates in common
-                if len(_candidates & candidates) == 2:
-                    pincers_row.append(_i)
-
-            # Check for pincers in box
-            for _r in range(r // 3 * 3, r // 3 * 3 + 3):
-                for _c in range(c // 3 * 3, c // 3 * 3 + 3):
-                    if _r == r and _c == c:
-                        continue
-                    _i = cell_index(_r, _c)
-                    _candidates = self.candidates[_i]
-                    if len(_candidates) != 2:
-                        continue
-                    # Take if there is two candidate in common
-                    if len(_candidates & candidates) == 2:
-                        pincers_box.append(_i)
+        """
+            A trivalue pivot xyz seeing bivalue pincers xz and yz: eliminate z from the cells seeing the pivot and both pincers.
+        """
+        return self.apply_wings(find_xyz_wings)
 
-            pincers_rb = product(pincers_row, pincers_box)
-            pincers_cb = product(pincers_column, pincers_box)
+    def w_wing(self) -> int:
+        """
+            Two bivalue cells xy joined by a conjugate pair of x: eliminate y from the cells seeing both.
+        """
+        return self.apply_wings(find_w_wings, self.candidates.cached('link_index', link_index))
 
-            cnt = 0
+    def wxyz_wing(self) -> int:
+        """
+            Four cells with four candidates where only one digit z is not restricted to one cell: eliminate z from the cells
+            seeing all the cells holding z.
+        """
+        return self.apply_wings(find_wxyz_wings)
 
-            for ir, ib in pincers_rb:
-                if self.candidates[ir] | self.candidates[ib] == candidates:
-                    candidate_to_eliminiate = (self.candidates[ir] & self.candidates[ib]).pop()
-                    rir = row_of(ir)
-                    rib = row_of(ib)
-                    # Exception: 2 pincers and pivot in the same row
-                    if rir == rib:
-                        continue
-                    print(f"xyz-wing: Eliminate {candidate_to_eliminiate} from row {rir} and box {b}")
-                    # Remove the common candidate in the same row and same box of the pivot
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(r=r % 3, b=b)) - {i},
-                        candidate_to_eliminiate
-                    )
-
-            for ic, ib in pincers_cb:
-                if self.candidates[ic] | self.candidates[ib] == candidates:
-                    candidate_to_eliminiate = (self.candidates[ic] & self.candidates[ib]).pop()
-                    # Exception: 2 pincers and pivot in the same column
-                    if column_of(ic) == column_of(ib):
-                        continue
-                    # Remove the common candidate in the same column and same box of the pivot
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(c=c % 3, b=b)) - {i},
-                        candidate_to_eliminiate
-                    )
+    def apply_wings(self, find_wings, *args) -> int:
+        '''
+            Apply the eliminations of find_wings(masks, index, *args), over the value index of the current candidates.
+        '''
+        index = self.candidates.cached('value_index', value_index)
+        return self.apply_eliminations(find_wings(self.candidates.masks, index, *args))
 
-        return cnt
+    def simple_coloring(self) -> int:
+        """
+            Color the conjugate pairs of each digit with two colors: eliminate a color with two cells seeing each other,
+            or the digit from the cells seeing both colors.
+        """
+        if not any(self.candidates.changed_units('simple_coloring')):
+            return 0
+        links = self.candidates.cached('link_index', link_index)
+        return self.apply_eliminations(find_coloring(self.candidates.masks, links))
 
-    def eliminate_using_all_techniques(self) -> int:
-        cnt = 0
-        cnt += self.pointing_pair()
-        cnt += self.box_line_reduction()
-        cnt += self.box_box_reduction()
-        cnt += self.naked_subsets()
-        cnt += self.hidden_subsets()
-        cnt += self.y_wing()
-        cnt += self.x_wing()
-        cnt += self.xyz_wing()
-        cnt += self.swordfish()
-        cnt += self.jellyfish()
-        if cnt > 0:
-            cnt += self.eliminate_using_all_techniques()
-        return cnt
+    def x_chain(self) -> int:
+        """
+            Chains of conjugate pairs of a single digit: eliminate the digit from the cells seeing both ends.
+        """
+        graph = self.link_graph()
+        return self.apply_chains('x_chain', graph.conjugate, same_digit=True)
+
+    def xy_chain(self) -> int:
+        """
+            Chains of bivalue cells, linked by a shared digit: eliminate the digit of both ends from the cells seeing them.
+        """
+        graph = self.link_graph()
+        return self.apply_chains('xy_chain', graph.bivalue, same_digit=True)
+
+    def aic(self) -> int:
+        """
+            Alternating inference chains, over both conjugate pairs and bivalue cells.
+        """
+        graph = self.link_graph()
+        return self.apply_chains('aic', graph.strong)
+
+    def link_graph(self) -> LinkGraph:
+        links = self.candidates.cached('link_index', link_index)
+        return self.candidates.cached('link_graph', lambda masks: link_graph(masks, links))
 
-    def solve(self, is_recursive=False) -> int:
+    def apply_chains(self, key: str, strong: Dict[int, int], max_length: int = MAX_CHAIN_LENGTH,
+                     same_digit: bool = False) -> int:
+        '''
+            Apply the eliminations of the chains over strong links, unless no unit changed since the last search with key.
+        '''
+        if not any(self.candidates.changed_units(key)):
+            return 0
+        return self.apply_eliminations(find_chains(self.link_graph(), strong, max_length, same_digit))
+
+    def apply_eliminations(self, eliminations: Iterable[Elimination]) -> int:
         cnt = 0
-        if not is_recursive:
-            self.compute_candidates()
-            cnt += self.solve_hidden_singles()
-        self.eliminate_using_all_techniques()
-        cnt += self.solve_hidden_singles()
-        if cnt > 0:
-            cnt += self.solve(is_recursive=True)
+        for elimination in eliminations:
+            cnt += self.eliminate_mask_of_indices(*elimination)
         return cnt
 
-    def solve_and_display(self) -> Sudoku:
+    def eliminate_using_all_techniques(self) -> int:
+        '''
+            Apply the elimination techniques until none of them makes progress, without placing any cell.
+        '''
+        return sum(Scheduler(ELIMINATION_TECHNIQUES).run(self).values())
+
+    def solve(self, fallback: str = None) -> int:
+        '''
+            Solve the Sudoku with the techniques of the scheduler. If they get stuck and a fallback is given ("dlx"),
+            complete the Sudoku by searching from the remaining candidates.
+            Return the number of cells solved. The number of cells filled by each phase is recorded in phases.
+        '''
+        if fallback is not None and fallback not in FALLBACKS:
+            raise ValueError(f'Unknown fallback: {fallback}')
+        empty = self.cells.count(0)
+        self.compute_candidates()
+        if self.trace is not None:
+            self.trace.begin(self.cells)
+        self.techniques_used = self.scheduler.run(self)
+        self.phases = {'logic': empty - self.cells.count(0)}
+
+        if fallback is not None:
+            searched = 0
+            if 0 in self.cells and self.valid:
+                solution = solve_exact_cover(self.cells, self.candidates.masks)
+                if solution is not None:
+                    if self.trace is not None:
+                        self.trace.set_technique(fallback)
+                    for i in range(81):
+                        if self.cells[i] == 0:
+                            self.place_cell(i, solution[i])
+                            searched += 1
+            self.phases[fallback] = searched
+
+        return empty - self.cells.count(0)
+
+    def count_solutions(self, limit: int = 2) -> int:
+        '''
+            Count the solutions of the Sudoku, stopping at limit. The search starts from the current candidates, so after
+            solve it only explores what the techniques left. If the candidates of all the cells have not been computed since the
+            cells were set, it starts from the cells. The Sudoku is not changed.
+        '''
+        masks = self.candidates.masks if self.candidates_computed else None
+        return count_solutions(self.cells, masks, limit)
+
+    def is_unique(self) -> bool:
+        return self.count_solutions(2) == 1
+
+    def solve_and_display(self, fallback: str = None) -> Sudoku:
         print(f"🔢 {self.name}")
         if not self.valid:
             print(f"❗ Invalid {self.name}!")
@@ -615,10 +616,12 @@ class Sudoku:
         self.display()
         print(f"⌛ Solving {self.name}...")
         start = timer()
-        cells_solved = self.solve()
+        cells_solved = self.solve(fallback)
         end = timer()
         self.display()
         print(f"{self.name}: {cells_solved} cells solved")
+        if fallback is not None:
+            print(", ".join(f"{phase}: {cnt}" for phase, cnt in self.phases.items()))
         if self.solved:
             print(f"✅ {self.name} solved in {end - start:.4f} seconds!")
         else:
@@ -630,22 +633,11 @@ class Sudoku:
 
     @ property
     def valid(self) -> bool:
-        for i in range(9):
-            column = [v for v in self.column(i) if v != 0]
-            box = [v for v in self.box(i) if v != 0]
-            row = [v for v in self.row(i) if v != 0]
-
-            if len(set(column)) != len(column):
-                return False
-            if len(set(box)) != len(box):
-                return False
-            if len(set(row)) != len(row):
-                return False
-        return True
+        return self.conflicts == 0
 
     @ property
     def solved(self) -> bool:
-        return self.valid and all(v != 0 for v in self.cells)
+        return self.conflicts == 0 and self.filled == 81
 
     @ classmethod
     def from_file(cls, filename: str):
@@ -653,6 +645,22 @@ class Sudoku:
         sudoku.set_cells(load_cells_from_file(filename))
         return sudoku
 
+    @ classmethod
+    def from_trace(cls, trace: Trace, steps: int = None) -> Sudoku:
+        '''
+            Rebuild the Sudoku after the first steps events of a trace (all of them by default).
+        '''
+        if trace.dropped:
+            raise ValueError(f'Trace overflowed: {trace.dropped} events were dropped')
+        sudoku = cls(list(trace.start))
+        sudoku.compute_candidates()
+        for event in trace.events()[:steps]:
+            if event.kind == PLACE:
+                sudoku.place_cell(event.cell, event.digits[0])
+            else:
+                sudoku.candidates.eliminate((event.cell,), digits_mask(event.digits))
+        return sudoku
+
     def display(self):
         for r1 in range(3):
             for r2 in range(3):
@@ -676,7 +684,7 @@ class Sudoku:
     def display_candidates(self):
         def display_set(i: int):
             print("".join(str(n)
-                  for n in self.candidates[i]).center(10), end=" ")
+                  for n in MASK_DIGITS[self.candidates.masks[i]]).center(10), end=" ")
         for r1 in range(3):
             for r2 in range(3):
                 r = r1 * 3 + r2
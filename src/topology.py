@@ -0,0 +1,48 @@
+"""
+    Board topology tables, built once at import.
+
+    Units are numbered 0-8 for rows, 9-17 for columns and 18-26 for boxes.
+    Mini-lines are the 3 cells where a row (or column) crosses a box, indexed by box and by the row (or column) offset inside the box.
+"""
+
+from typing import Tuple
+
+Cells = Tuple[int, ...]
+
+ALL_CELLS: Cells = tuple(range(81))
+
+ROW_OF: Cells = tuple(i // 9 for i in range(81))
+COLUMN_OF: Cells = tuple(i % 9 for i in range(81))
+BOX_OF: Cells = tuple(i // 27 * 3 + i % 9 // 3 for i in range(81))
+POSITIONS: Tuple[Tuple[int, int, int], ...] = tuple(zip(ROW_OF, COLUMN_OF, BOX_OF))
+
+ROWS: Tuple[Cells, ...] = tuple(tuple(r * 9 + c for c in range(9)) for r in range(9))
+COLUMNS: Tuple[Cells, ...] = tuple(tuple(r * 9 + c for r in range(9)) for c in range(9))
+BOXES: Tuple[Cells, ...] = tuple(tuple(i for i in range(81) if BOX_OF[i] == b) for b in range(9))
+
+UNITS: Tuple[Cells, ...] = ROWS + COLUMNS + BOXES
+CELL_UNITS: Tuple[Tuple[int, int, int], ...] = tuple((r, 9 + c, 18 + b) for r, c, b in POSITIONS)
+
+PEERS: Tuple[Cells, ...] = tuple(
+    tuple(sorted(set(ROWS[r] + COLUMNS[c] + BOXES[b]) - {i})) for i, (r, c, b) in enumerate(POSITIONS))
+PEER_SETS = tuple(frozenset(peers) for peers in PEERS)
+
+BAND_BOXES: Tuple[Cells, ...] = ((0, 1, 2), (3, 4, 5), (6, 7, 8))
+STACK_BOXES: Tuple[Cells, ...] = ((0, 3, 6), (1, 4, 7), (2, 5, 8))
+BAND_ROWS: Tuple[Cells, ...] = ((0, 1, 2), (3, 4, 5), (6, 7, 8))
+STACK_COLUMNS: Tuple[Cells, ...] = ((0, 1, 2), (3, 4, 5), (6, 7, 8))
+
+MINI_ROWS: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(BOXES[b][k * 3:k * 3 + 3] for k in range(3)) for b in range(9))
+MINI_COLUMNS: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(BOXES[b][k::3] for k in range(3)) for b in range(9))
+
+# Cells of the row (or column) outside the box, and cells of the box outside the mini-line.
+MINI_ROW_REST_OF_LINE: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(tuple(i for i in ROWS[b // 3 * 3 + k] if BOX_OF[i] != b) for k in range(3)) for b in range(9))
+MINI_ROW_REST_OF_BOX: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(tuple(i for i in BOXES[b] if i not in MINI_ROWS[b][k]) for k in range(3)) for b in range(9))
+MINI_COLUMN_REST_OF_LINE: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(tuple(i for i in COLUMNS[b % 3 * 3 + k] if BOX_OF[i] != b) for k in range(3)) for b in range(9))
+MINI_COLUMN_REST_OF_BOX: Tuple[Tuple[Cells, ...], ...] = tuple(
+    tuple(tuple(i for i in BOXES[b] if i not in MINI_COLUMNS[b][k]) for k in range(3)) for b in range(9))
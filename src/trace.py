@@ -0,0 +1,89 @@
+"""
+    Step trace of a solve: every placement and elimination made by the techniques, with the cells that justify it.
+
+    Events are kept in a preallocated ring buffer of parallel arrays, so the latest events survive long solves.
+"""
+
+from array import array
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from src.candidates import MASK_DIGITS
+from src.topology import Cells
+
+PLACE = 0
+ELIMINATE = 1
+
+
+class TraceEvent(NamedTuple):
+    kind: int
+    technique: str
+    digits: Tuple[int, ...]
+    cell: int
+    reasons: Cells
+
+
+class Trace:
+    """
+        Ring buffer of solve events. Set a Trace as Sudoku.trace to record the next solve, and rebuild any intermediate
+        state with Sudoku.from_trace.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.kinds = array('B', [0]) * capacity
+        self.techniques = array('B', [0]) * capacity
+        self.values = array('H', [0]) * capacity
+        self.cells = array('B', [0]) * capacity
+        self.reasons: List[Cells] = [()] * capacity
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.technique = 0
+        self.count = 0
+        self.start: List[int] = [0] * 81
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self.count - self.capacity)
+
+    def begin(self, cells: Sequence[int]):
+        '''
+            Start a new trace from a grid.
+        '''
+        self.start = list(cells)
+        self.count = 0
+        self.set_technique('')
+
+    def set_technique(self, name: str):
+        technique = self.name_ids.get(name)
+        if technique is None:
+            technique = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        self.technique = technique
+
+    def record(self, kind: int, cell: int, value: int, reasons: Cells):
+        '''
+            Record a placement of digit value, or an elimination of the digits of mask value.
+        '''
+        k = self.count % self.capacity
+        self.kinds[k] = kind
+        self.techniques[k] = self.technique
+        self.values[k] = value
+        self.cells[k] = cell
+        self.reasons[k] = reasons
+        self.count += 1
+
+    def event(self, k: int) -> TraceEvent:
+        kind = self.kinds[k]
+        value = self.values[k]
+        digits = (value,) if kind == PLACE else MASK_DIGITS[value]
+        return TraceEvent(kind, self.names[self.techniques[k]], digits, self.cells[k], tuple(self.reasons[k]))
+
+    def events(self) -> List[TraceEvent]:
+        '''
+            Events kept in the buffer, oldest first.
+        '''
+        first = self.dropped
+        return [self.event(k % self.capacity) for k in range(first, self.count)]
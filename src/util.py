@@ -1,5 +1,13 @@
+from typing import List, Sequence, Tuple, Union
 
-from typing import List, Tuple
+from src.exceptions import InvalidCellValue, InvalidSudoku
+from src.topology import *
+
+Puzzle = Union[str, bytes, Sequence[int]]
+
+# Map '0'-'9' to 0-9 and '.' to 0, any other byte to an invalid value
+DECODE_TABLE = bytes(b - 48 if 48 <= b <= 57 else 0 if b == 46 else 255 for b in range(256))
+ENCODE_TABLE = bytes(b + 48 if b <= 9 else b for b in range(256))
 
 
 def valid_cell_value(n: int) -> bool:
@@ -11,14 +19,11 @@ def cell_index(r: int, c: int) -> int:
 
 
 def position(i: int) -> Tuple[int, int, int]:
-    r = row_of(i)
-    c = column_of(i)
-    b = box_of_rc(r, c)
-    return r, c, b
+    return POSITIONS[i]
 
 
 def box_of_i(i: int) -> int:
-    return box_of_rc(row_of(i), column_of(i))
+    return BOX_OF[i]
 
 
 def column_of(i: int) -> int:
@@ -33,32 +38,45 @@ def box_of_rc(r: int, c: int) -> int:
     return r // 3 * 3 + c // 3
 
 
-def row_indices(r: int) -> List[int]:
-    return [r * 9 + i for i in range(9)]
+def row_indices(r: int) -> Tuple[int, ...]:
+    return ROWS[r]
+
+
+def column_indices(c: int) -> Tuple[int, ...]:
+    return COLUMNS[c]
 
 
-def column_indices(c: int) -> List[int]:
-    return [i * 9 + c for i in range(9)]
+def box_indices(b: int) -> Tuple[int, ...]:
+    return BOXES[b]
 
 
-def box_indices(b: int) -> List[int]:
-    box_r = b // 3
-    box_c = b % 3
-    c_start = box_c * 3
-    c_end = c_start + 3
-    r_start = box_r * 3
-    r_end = r_start + 3
-    return [cell_index(r, c) for r in range(r_start, r_end) for c in range(c_start, c_end)]
+def rows_of_box(b: int) -> Tuple[int, ...]:
+    return BAND_ROWS[b // 3]
 
 
-def rows_of_box(b: int) -> List[int]:
-    box_start_r = b // 3 * 3
-    return [box_start_r + i for i in range(3)]
+def columns_of_box(b: int) -> Tuple[int, ...]:
+    return STACK_COLUMNS[b % 3]
+
+
+def parse_cells(puzzle: Puzzle) -> List[int]:
+    '''
+        Parse a puzzle given as 81 digits, either a string (using '0' or '.' for blanks) or a sequence of ints.
+    '''
+    if isinstance(puzzle, str):
+        puzzle = puzzle.encode('ascii', 'replace')
+    if isinstance(puzzle, (bytes, bytearray)):
+        puzzle = puzzle.translate(DECODE_TABLE)
+    if len(puzzle) != 81:
+        raise InvalidSudoku()
+    cells = list(puzzle)
+    for cell in cells:
+        if not valid_cell_value(cell):
+            raise InvalidCellValue()
+    return cells
 
 
-def columns_of_box(b: int) -> List[int]:
-    box_start_c = b % 3 * 3
-    return [box_start_c + i for i in range(3)]
+def cells_to_string(cells: Sequence[int]) -> str:
+    return bytes(cells).translate(ENCODE_TABLE).decode('ascii')
 
 
 def load_cells_from_file(filename: str) -> List[int]:
@@ -78,29 +96,17 @@ def load_cells_from_file(filename: str) -> List[int]:
     return cells
 
 
-def query_indices(r: int = None, c: int = None, b: int = None) -> List[int]:
+def query_indices(r: int = None, c: int = None, b: int = None) -> Tuple[int, ...]:
     if r is None and c is None and b is None:
-        return list(range(81))
+        return ALL_CELLS
     if r is not None and c is not None:
-        return [cell_index(r, c)]
+        return (cell_index(r, c),)
     if r is not None:
         if b is not None:
-            r_start = b // 3 * 3
-            r += r_start
-            c_start = b % 3 * 3
-            c_end = c_start + 3
-            if c is not None:
-                c += c_start
-                return [cell_index(r, c)]
-            return row_indices(r)[c_start:c_end]
-        return row_indices(r)
+            return MINI_ROWS[b][r]
+        return ROWS[r]
     if c is not None:
         if b is not None:
-            c_start = b % 3 * 3
-            c += c_start
-            r_start = b // 3 * 3
-            r_end = r_start + 3
-            return column_indices(c)[r_start:r_end]
-        return column_indices(c)
-    if b is not None:
-        return box_indices(b)
+            return MINI_COLUMNS[b][c]
+        return COLUMNS[c]
+    return BOXES[b]
@@ -0,0 +1,144 @@
+"""
+    Candidate propagation vectorized over many boards with NumPy (optional dependency).
+
+    Boards are (N, 81) uint8 arrays of digits and candidates are (N, 81) uint16 arrays of 9-bit masks.
+    Naked and hidden singles are placed on all boards at once, and the boards that stall go to the Sudoku technique pipeline.
+"""
+
+from timeit import default_timer as timer
+from typing import Iterable, List, Tuple
+
+from src.batch import SolveResult, solve_cells
+from src.candidates import LOWEST_DIGIT, POPCOUNT
+from src.scheduler import Scheduler
+from src.sudoku import Sudoku
+from src.topology import CELL_UNITS, UNITS
+from src.util import Puzzle, cells_to_string, parse_cells
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    UNITS_ARRAY = np.array(UNITS, dtype=np.intp)
+    CELL_UNITS_ARRAY = np.array(CELL_UNITS, dtype=np.intp)
+    POPCOUNT_ARRAY = np.array(POPCOUNT, dtype=np.uint8)
+    LOWEST_DIGIT_ARRAY = np.array(LOWEST_DIGIT, dtype=np.uint8)
+    DIGIT_BITS = np.array([0] + [1 << (d - 1) for d in range(1, 10)], dtype=np.uint16)
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError('NumPy is required for vectorized propagation')
+
+
+def to_grids(puzzles: Iterable[Puzzle]) -> 'np.ndarray':
+    require_numpy()
+    grids = [parse_cells(puzzle) for puzzle in puzzles]
+    return np.array(grids, dtype=np.uint8).reshape(len(grids), 81)
+
+
+def unit_masks(grids: 'np.ndarray') -> 'np.ndarray':
+    '''
+        Masks of the digits placed in each unit, shape (N, 27).
+    '''
+    return np.bitwise_or.reduce(DIGIT_BITS[grids][:, UNITS_ARRAY], axis=2)
+
+
+def compute_candidates(grids: 'np.ndarray') -> 'np.ndarray':
+    require_numpy()
+    used = unit_masks(grids)[:, CELL_UNITS_ARRAY]
+    used = used[:, :, 0] | used[:, :, 1] | used[:, :, 2]
+    candidates = np.uint16(0x1FF) & ~used
+    candidates[grids != 0] = 0
+    return candidates
+
+
+def valid(grids: 'np.ndarray') -> 'np.ndarray':
+    '''
+        Whether each board has no digit repeated in a unit, shape (N,).
+    '''
+    require_numpy()
+    placed = np.count_nonzero(grids[:, UNITS_ARRAY], axis=2)
+    return (POPCOUNT_ARRAY[unit_masks(grids)] == placed).all(axis=1)
+
+
+def place_singles(grids: 'np.ndarray', candidates: 'np.ndarray') -> 'np.ndarray':
+    '''
+        Place the naked and hidden singles of every board in place. Return the number of cells placed on each board.
+    '''
+    n = len(grids)
+    placed = np.zeros((n, 81), dtype=np.uint8)
+
+    # Naked singles
+    naked = POPCOUNT_ARRAY[candidates] == 1
+    placed[naked] = LOWEST_DIGIT_ARRAY[candidates[naked]]
+
+    # Hidden singles: digits with a single candidate cell in a unit
+    unit_candidates = candidates[:, UNITS_ARRAY]
+    bits = (unit_candidates[:, :, :, None] >> np.arange(9, dtype=np.uint16)) & 1
+    unique = bits.sum(axis=2, dtype=np.uint8) == 1
+    hidden = (bits == 1) & unique[:, :, None, :]
+    board, unit, k, digit = np.nonzero(hidden)
+    placed[board, UNITS_ARRAY[unit, k]] = digit + 1
+
+    empty = grids == 0
+    placed[~empty] = 0
+    grids[empty] = placed[empty]
+    return np.count_nonzero(placed, axis=1)
+
+
+def propagate(grids: 'np.ndarray', max_iterations: int = 81) -> Tuple['np.ndarray', 'np.ndarray']:
+    '''
+        Place singles on all boards until they are solved or stall. Grids are updated in place.
+        Return the candidates of the boards and the number of cells placed on each board.
+    '''
+    require_numpy()
+    cells_solved = np.zeros(len(grids), dtype=np.int64)
+    candidates = compute_candidates(grids)
+    active = np.nonzero((grids == 0).any(axis=1))[0]
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+        sub_grids = grids[active]
+        placed = place_singles(sub_grids, candidates[active])
+        grids[active] = sub_grids
+        cells_solved[active] += placed
+        candidates[active] = compute_candidates(sub_grids)
+        # Keep the boards that progressed, are still incomplete and have no conflict
+        keep = (placed > 0) & (sub_grids == 0).any(axis=1) & valid(sub_grids)
+        active = active[keep]
+    return candidates, cells_solved
+
+
+def solve_bulk(puzzles: Iterable[Puzzle], scheduler: Scheduler = None, fallback: str = None) -> List[SolveResult]:
+    '''
+        Propagate singles on all puzzles at array speed, then solve the boards that stalled with the Sudoku techniques.
+        The elapsed time of each result includes its share of the vectorized phase.
+    '''
+    start = timer()
+    grids = to_grids(puzzles)
+    n = len(grids)
+    if n == 0:
+        return []
+    _, cells_solved = propagate(grids)
+    solved = valid(grids) & ~(grids == 0).any(axis=1)
+    shared_elapsed = (timer() - start) / n
+
+    sudoku = Sudoku()
+    if scheduler is not None:
+        sudoku.scheduler = scheduler
+    results = []
+    for k in range(n):
+        cells = grids[k].tolist()
+        singles = int(cells_solved[k])
+        techniques = {'vectorized_singles': singles} if singles else {}
+        if solved[k]:
+            results.append(SolveResult(cells_to_string(cells), True, singles, shared_elapsed, techniques))
+            continue
+        result = solve_cells(sudoku, cells, fallback)
+        techniques.update(result.techniques)
+        results.append(SolveResult(result.solution, result.solved, singles + result.cells_solved,
+                                   shared_elapsed + result.elapsed, techniques))
+    return results
@@ -0,0 +1,189 @@
+"""
+    Wings (Y-Wing, XYZ-Wing, W-Wing and WXYZ-Wing) over an index of the cells with few candidates.
+
+    The value index lists the cells with 2 to 4 candidates by count and by unit, and the bivalue cells by candidate pair.
+    The link index lists the conjugate pairs of each digit: the two cells of a unit where the digit is a candidate,
+    when there are only two. Both are built from the masks and cached by the candidate store until a cell changes,
+    so a wing search costs about the number of cells with few candidates instead of a scan of the peers of every cell.
+"""
+
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from src.candidates import DIGIT_MASKS, MASK_DIGITS, POPCOUNT, Elimination
+from src.topology import CELL_UNITS, PEER_SETS, UNITS, Cells
+
+MAX_WING_CANDIDATES = 4
+
+
+class ValueIndex(NamedTuple):
+    by_count: Tuple[List[int], ...]
+    units: Tuple[List[int], ...]
+    pairs: Dict[int, List[int]]
+
+
+Links = Tuple[List[Tuple[int, int]], ...]
+
+
+def value_index(masks: Sequence[int]) -> ValueIndex:
+    by_count = tuple([] for _ in range(MAX_WING_CANDIDATES + 1))
+    units = tuple([] for _ in range(27))
+    pairs = {}
+    for i in range(81):
+        n = POPCOUNT[masks[i]]
+        if 2 <= n <= MAX_WING_CANDIDATES:
+            by_count[n].append(i)
+            for u in CELL_UNITS[i]:
+                units[u].append(i)
+            if n == 2:
+                pairs.setdefault(masks[i], []).append(i)
+    return ValueIndex(by_count, units, pairs)
+
+
+def link_index(masks: Sequence[int]) -> Links:
+    '''
+        Conjugate pairs of each digit, by unit.
+    '''
+    links = tuple([] for _ in range(10))
+    for unit in UNITS:
+        seen_once = 0
+        seen_twice = 0
+        seen_more = 0
+        for i in unit:
+            mask = masks[i]
+            seen_more |= seen_twice & mask
+            seen_twice |= seen_once & mask
+            seen_once |= mask
+        for d in MASK_DIGITS[seen_twice & ~seen_more]:
+            bit = DIGIT_MASKS[d]
+            links[d].append(tuple(i for i in unit if masks[i] & bit))
+    return links
+
+
+def wing_peers(masks: Sequence[int], index: ValueIndex, i: int, max_count: int = 2) -> List[int]:
+    '''
+        Peers of cell i with 2 to max_count candidates.
+    '''
+    peers = {}
+    for u in CELL_UNITS[i]:
+        for j in index.units[u]:
+            if j != i and POPCOUNT[masks[j]] <= max_count:
+                peers[j] = None
+    return list(peers)
+
+
+def common_targets(masks: Sequence[int], cells: Cells, mask: int) -> Cells:
+    '''
+        Cells seeing all the cells, with a candidate of mask.
+    '''
+    seen = PEER_SETS[cells[0]]
+    for i in cells[1:]:
+        seen = seen & PEER_SETS[i]
+    return tuple(sorted(i for i in seen if masks[i] & mask))
+
+
+def find_y_wings(masks: Sequence[int], index: ValueIndex) -> List[Elimination]:
+    '''
+        A bivalue pivot xy seeing bivalue pincers xz and yz: z is removed from the cells seeing both pincers.
+    '''
+    eliminations = []
+    for pivot in index.by_count[2]:
+        xy = masks[pivot]
+        pincers = [i for i in wing_peers(masks, index, pivot) if POPCOUNT[masks[i] & xy] == 1]
+        for a in range(len(pincers)):
+            for b in range(a + 1, len(pincers)):
+                i1 = pincers[a]
+                i2 = pincers[b]
+                if masks[i1] ^ masks[i2] != xy:
+                    continue
+                z = masks[i1] & masks[i2]
+                targets = common_targets(masks, (i1, i2), z)
+                if targets:
+                    eliminations.append(Elimination(targets, z, (pivot, i1, i2)))
+    return eliminations
+
+
+def find_xyz_wings(masks: Sequence[int], index: ValueIndex) -> List[Elimination]:
+    '''
+        A trivalue pivot xyz seeing bivalue pincers xz and yz: z is removed from the cells seeing the pivot and both pincers.
+    '''
+    eliminations = []
+    for pivot in index.by_count[3]:
+        xyz = masks[pivot]
+        pincers = [i for i in wing_peers(masks, index, pivot) if masks[i] & ~xyz == 0]
+        for a in range(len(pincers)):
+            for b in range(a + 1, len(pincers)):
+                i1 = pincers[a]
+                i2 = pincers[b]
+                if masks[i1] == masks[i2]:
+                    continue
+                z = masks[i1] & masks[i2]
+                targets = common_targets(masks, (pivot, i1, i2), z)
+                if targets:
+                    eliminations.append(Elimination(targets, z, (pivot, i1, i2)))
+    return eliminations
+
+
+def find_w_wings(masks: Sequence[int], index: ValueIndex, links: Links) -> List[Elimination]:
+    '''
+        Two bivalue cells xy that do not see each other, joined by a conjugate pair of x whose ends see one cell each:
+        one of the two cells is y, so y is removed from the cells seeing both.
+    '''
+    eliminations = []
+    for xy, cells in index.pairs.items():
+        for a in range(len(cells)):
+            for b in range(a + 1, len(cells)):
+                i1 = cells[a]
+                i2 = cells[b]
+                if i2 in PEER_SETS[i1]:
+                    continue
+                peers1 = PEER_SETS[i1]
+                peers2 = PEER_SETS[i2]
+                for x in MASK_DIGITS[xy]:
+                    y = xy & ~DIGIT_MASKS[x]
+                    for e1, e2 in links[x]:
+                        if e1 in (i1, i2) or e2 in (i1, i2):
+                            continue
+                        if e1 in peers1 and e2 in peers2 or e1 in peers2 and e2 in peers1:
+                            targets = common_targets(masks, (i1, i2), y)
+                            if targets:
+                                eliminations.append(Elimination(targets, y, (i1, i2, e1, e2)))
+    return eliminations
+
+
+def find_wxyz_wings(masks: Sequence[int], index: ValueIndex) -> List[Elimination]:
+    '''
+        A hinge and 3 of its peers, with 4 candidates in all, where only one digit z is shared by two cells not seeing each other:
+        one of the cells holding z must be z, so z is removed from the cells seeing all of them.
+    '''
+    eliminations = []
+    for n in range(2, MAX_WING_CANDIDATES + 1):
+        for hinge in index.by_count[n]:
+            hinge_mask = masks[hinge]
+            peers = [i for i in wing_peers(masks, index, hinge, MAX_WING_CANDIDATES) if POPCOUNT[hinge_mask | masks[i]] <= 4]
+            for a in range(len(peers)):
+                pa = peers[a]
+                mask_a = hinge_mask | masks[pa]
+                for b in range(a + 1, len(peers)):
+                    pb = peers[b]
+                    mask_b = mask_a | masks[pb]
+                    if POPCOUNT[mask_b] > 4:
+                        continue
+                    # The hinge sees its peers, so only the digits shared by peers not seeing each other are unrestricted
+                    free_b = 0 if pb in PEER_SETS[pa] else masks[pa] & masks[pb]
+                    for c in range(b + 1, len(peers)):
+                        pc = peers[c]
+                        if POPCOUNT[mask_b | masks[pc]] != 4:
+                            continue
+                        free = free_b
+                        if pc not in PEER_SETS[pa]:
+                            free |= masks[pa] & masks[pc]
+                        if pc not in PEER_SETS[pb]:
+                            free |= masks[pb] & masks[pc]
+                        if POPCOUNT[free] != 1:
+                            continue
+                        cells = (hinge, pa, pb, pc)
+                        holders = tuple(i for i in cells if masks[i] & free)
+                        targets = tuple(i for i in common_targets(masks, holders, free) if i not in cells)
+                        if targets:
+                            eliminations.append(Elimination(targets, free, cells))
+    return eliminations
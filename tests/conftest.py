@@ -0,0 +1,13 @@
+import pytest
+
+from src.boards.difficulty import (sudoku_easy, sudoku_evil, sudoku_hard,
+                                   sudoku_medium)
+from src.boards.technique import sudoku_x_wing
+
+
+@pytest.fixture
+def puzzles():
+    '''
+        Cells of 5 boards, from easy to evil. The techniques solve all of them but the last one.
+    '''
+    return [f().cells for f in (sudoku_easy, sudoku_medium, sudoku_hard, sudoku_x_wing, sudoku_evil)]
@@ -0,0 +1,24 @@
+from src.batch import solve_many
+from src.boards.difficulty import *
+from src.scheduler import Scheduler
+from src.util import cells_to_string
+
+
+class TestBatch:
+    def test_solve_many(self, capsys):
+        puzzles = [cells_to_string(sudoku_easy().cells), sudoku_expert().cells,
+                   cells_to_string(sudoku_evil().cells).replace("0", ".")]
+        results = list(solve_many(puzzles))
+        assert [result.solved for result in results] == [True, True, False]
+        assert results[0].cells_solved == 43
+        assert results[0].solution.startswith("962451378")
+        assert results[1].techniques["solve_hidden_singles"] == 59
+        assert capsys.readouterr().out == ""
+
+    def test_solve_many_options(self):
+        evil = sudoku_evil().cells
+        result, = solve_many([evil], fallback="dlx")
+        assert result.solved and "0" not in result.solution
+
+        result, = solve_many([evil], scheduler=Scheduler([]))
+        assert result.cells_solved == 0 and result.techniques == {}
@@ -0,0 +1,14 @@
+from benchmarks.run import compare, run
+
+
+class TestBenchmark:
+    def test_run_and_compare(self):
+        report = run(repeat=1)
+        assert "sudoku_easy" in report["boards"]
+        assert "sudoku_xyz_wing" in report["boards"]
+        assert report["aggregate"]["runs"] == len(report["boards"])
+        assert compare(report, report) == []
+
+        slower = {"boards": {name: dict(summary, p50=summary["p50"] * 2) for name, summary in report["boards"].items()},
+                  "aggregate": dict(report["aggregate"], p50=report["aggregate"]["p50"] * 2)}
+        assert compare(slower, report) == list(report["boards"]) + ["aggregate"]
@@ -0,0 +1,51 @@
+from src.boards.difficulty import sudoku_easy
+from src.candidates import *
+
+
+class TestCandidates:
+    def test_bit_helpers(self):
+        assert digit_mask(1) == 0b1
+        assert digit_mask(9) == 0b100000000
+        assert digits_mask([2, 5, 8, 9]) == 0b110010010
+        assert mask_digits(0b110010010) == (2, 5, 8, 9)
+        assert popcount(ALL_CANDIDATES) == 9
+        assert popcount(0) == 0
+        assert lowest_digit(0b110010010) == 2
+        assert lowest_digit(0) == 0
+
+    def test_set_view(self):
+        candidates = Candidates()
+        candidates.masks[0] = digits_mask([2, 5, 8, 9])
+        assert candidates[0] == {2, 5, 8, 9}
+        assert candidates[1] == set()
+        assert len(list(candidates)) == 81
+
+    def test_eliminate(self):
+        candidates = Candidates()
+        candidates.masks[0] = digits_mask([1, 2, 3])
+        candidates.masks[1] = digits_mask([2, 3])
+        assert candidates.eliminate([0, 1, 2], digits_mask([2, 3, 4])) == 4
+        assert candidates[0] == {1}
+        assert candidates[1] == set()
+        assert candidates.union([0, 1]) == digit_mask(1)
+        assert candidates.count() == 1
+
+    def test_sudoku_candidates(self):
+        sudoku = sudoku_easy()
+        sudoku.compute_candidates()
+        assert sudoku.candidates[0] == {2, 5, 8, 9}
+        assert sudoku.candidates[1] == set()
+        sudoku.place_cell(0, 2)
+        assert sudoku.candidates[0] == set()
+        assert 2 not in sudoku.candidates[8]
+
+    def test_changed_units(self):
+        candidates = Candidates()
+        candidates.masks[0] = digits_mask([1, 2])
+        assert all(candidates.changed_units('test'))
+        assert not any(candidates.changed_units('test'))
+        candidates.eliminate([0], digit_mask(1))
+        dirty = candidates.changed_units('test')
+        assert [u for u in range(27) if dirty[u]] == [0, 9, 18]
+        candidates.eliminate([0], digit_mask(1))
+        assert not any(candidates.changed_units('test'))
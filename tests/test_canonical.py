@@ -0,0 +1,52 @@
+import random
+
+from src.boards.difficulty import *
+from src.canonical import SolutionCache, canonicalize
+from src.sudoku import Sudoku
+
+
+def random_symmetry(cells, rng: random.Random):
+    digits = [0] + rng.sample(range(1, 10), 9)
+    bands = rng.sample(range(3), 3)
+    stacks = rng.sample(range(3), 3)
+    rows = [band * 3 + r for band in bands for r in rng.sample(range(3), 3)]
+    columns = [stack * 3 + c for stack in stacks for c in rng.sample(range(3), 3)]
+    grid = [digits[cells[r * 9 + c]] for r in rows for c in columns]
+    if rng.random() < 0.5:
+        grid = [grid[c * 9 + r] for r in range(9) for c in range(9)]
+    return grid
+
+
+class TestCanonical:
+    def test_invariant(self):
+        rng = random.Random(1)
+        for board in (sudoku_easy(), sudoku_hard(), sudoku_evil()):
+            form, transform = canonicalize(board.cells)
+            assert transform.apply(board.cells) == list(form)
+            assert transform.invert(form) == board.cells
+            for _ in range(5):
+                assert canonicalize(random_symmetry(board.cells, rng))[0] == form
+
+    def test_distinct(self):
+        assert canonicalize(sudoku_easy().cells)[0] != canonicalize(sudoku_medium().cells)[0]
+
+    def test_cache(self):
+        rng = random.Random(2)
+        cache = SolutionCache(maxsize=2)
+        puzzle = sudoku_expert().cells
+        assert cache.solve(puzzle) is not None
+        for _ in range(5):
+            variant = random_symmetry(puzzle, rng)
+            solution = cache.solve(variant)
+            sudoku = Sudoku(solution)
+            assert sudoku.solved
+            assert all(v == 0 or v == s for v, s in zip(variant, solution))
+        assert cache.stats() == {"size": 1, "hits": 5, "misses": 1}
+
+    def test_eviction(self):
+        cache = SolutionCache(maxsize=1)
+        cache.solve(sudoku_easy().cells)
+        cache.solve(sudoku_medium().cells)
+        cache.solve(sudoku_easy().cells)
+        assert len(cache) == 1
+        assert cache.misses == 3
@@ -0,0 +1,91 @@
+from src.boards.difficulty import *
+from src.candidates import DIGIT_MASKS, digits_mask
+from src.chains import (find_chains, find_coloring, implications, link_graph,
+                        node_of)
+from src.wings import link_index
+
+
+def graph_of(masks):
+    return link_graph(masks, link_index(masks))
+
+
+class TestChains:
+    def test_link_graph(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[8] = digits_mask((1, 3))
+        masks[4] = digits_mask((2, 3, 4))
+        graph = graph_of(masks)
+        a = node_of(0, 1)
+        # 1 is a conjugate pair of row 0, and cell 0 is bivalue
+        assert graph.conjugate[a] == 1 << node_of(8, 1)
+        assert graph.bivalue[a] == 1 << node_of(0, 2)
+        assert graph.strong[a] == 1 << node_of(8, 1) | 1 << node_of(0, 2)
+        assert graph.weak[node_of(4, 2)] == 1 << node_of(0, 2) | 1 << node_of(4, 3) | 1 << node_of(4, 4)
+
+    def test_implications(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[4] = digits_mask((2, 3))
+        graph = graph_of(masks)
+        on, off = implications(graph.weak, graph.bivalue, node_of(0, 1))
+        assert on == 1 << node_of(0, 2) | 1 << node_of(4, 3)
+        assert off >> node_of(4, 2) & 1
+
+    def test_x_chain(self):
+        masks = [0] * 81
+        # 1 is a conjugate pair in column 0 (r0c0, r4c0) and in column 7 (r1c7, r4c7), r4c0 and r4c7 share row 4
+        for i in (0, 36, 43, 16, 40, 10, 20):
+            masks[i] = DIGIT_MASKS[1]
+        graph = graph_of(masks)
+        eliminations = find_chains(graph, graph.conjugate, same_digit=True)
+        # r0c0 or r1c7 is 1: r1c1 sees both, r2c2 only sees r0c0
+        assert eliminations[0] == ((10,), DIGIT_MASKS[1], (0, 16))
+        assert all(20 not in e.cells for e in eliminations)
+
+    def test_xy_chain(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[4] = digits_mask((2, 3))
+        masks[40] = digits_mask((1, 3))
+        masks[36] = digits_mask((1, 5))
+        graph = graph_of(masks)
+        eliminations = find_chains(graph, graph.bivalue, same_digit=True)
+        assert ((36,), DIGIT_MASKS[1], (0, 40)) in eliminations
+
+    def test_max_length(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[4] = digits_mask((2, 3))
+        masks[40] = digits_mask((1, 3))
+        masks[36] = digits_mask((1, 5))
+        graph = graph_of(masks)
+        assert find_chains(graph, graph.bivalue, max_length=3, same_digit=True) == []
+
+    def test_coloring_trap(self):
+        masks = [0] * 81
+        # Conjugate pairs of 1: r0c0-r2c2 (box 0), r2c2-r6c2 (column 2) and r6c2-r6c7 (row 6), colored 0, 1, 0, 1
+        for i in (0, 20, 56, 61, 7, 4, 34):
+            masks[i] = DIGIT_MASKS[1]
+        eliminations = find_coloring(masks, link_index(masks))
+        # r0c7 sees r0c0 and r6c7, r0c4 and r3c7 only see one color
+        assert eliminations == [((7,), DIGIT_MASKS[1], (0, 20, 56, 61))]
+
+    def test_coloring_wrap(self):
+        masks = [0] * 81
+        # Conjugate pairs of 1: r0c0-r4c0, r4c0-r4c4, r4c4-r1c4 and r1c4-r0c5, so r0c0 and r0c5 have the same color
+        for i in (0, 36, 40, 13, 5, 8):
+            masks[i] = DIGIT_MASKS[1]
+        eliminations = find_coloring(masks, link_index(masks))
+        assert eliminations == [((0, 5, 40), DIGIT_MASKS[1], (0, 5, 13, 36, 40))]
+
+    def test_sound(self):
+        sudoku = sudoku_evil()
+        solution = sudoku_evil()
+        solution.solve("dlx")
+        sudoku.solve()
+        assert sudoku.techniques_used.get("aic", 0) > 0
+        masks = sudoku.candidates.masks
+        assert all(masks[i] & DIGIT_MASKS[solution.cells[i]] for i in range(81) if sudoku.cells[i] == 0)
+        # Nothing changed since the last search
+        assert sudoku.aic() == 0
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.batch import solve_many
+from src.boards.difficulty import *
+from src.boards.technique import *
+from src.cli import main, select_techniques
+from src.scheduler import TECHNIQUES
+from src.util import cells_to_string
+
+
+def write_puzzles(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    grid = sudoku_hard().cells
+    lines = [cells_to_string(sudoku_easy().cells), cells_to_string(sudoku_x_wing().cells)]
+    lines += ["".join(map(str, grid[r * 9:r * 9 + 9])) for r in range(9)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class TestCli:
+    def test_select_techniques(self):
+        assert select_techniques() == TECHNIQUES
+        assert select_techniques("solve_hidden_singles, x_wing") == ("solve_hidden_singles", "x_wing")
+        assert select_techniques(max_tier="pointing_pair") == TECHNIQUES[:2]
+        with pytest.raises(ValueError, match="unknown technique: nope"):
+            select_techniques("nope")
+
+    def test_line_output(self, tmp_path, capsys):
+        assert main([write_puzzles(tmp_path)]) == 0
+        out, err = capsys.readouterr()
+        solutions = out.splitlines()
+        assert len(solutions) == 3
+        expected = solve_many([sudoku_easy().cells, sudoku_x_wing().cells, sudoku_hard().cells])
+        assert solutions == [result.solution for result in expected]
+        assert all("0" not in solution for solution in solutions)
+        assert "3 puzzles, 3 solved" in err and "p99" in err
+
+    def test_jsonl_parallel(self, tmp_path, capsys):
+        path = write_puzzles(tmp_path)
+        assert main([path, "--format", "jsonl", "--jobs", "2", "--chunk-size", "1", "--quiet"]) == 0
+        out, err = capsys.readouterr()
+        rows = [json.loads(line) for line in out.splitlines()]
+        assert [row["line"] for row in rows] == [1, 2, 3]
+        assert all(row["solved"] for row in rows)
+        assert err == ""
+
+    def test_csv_output_file(self, tmp_path, capsys):
+        output = tmp_path / "solutions.csv"
+        assert main([write_puzzles(tmp_path), "-f", "csv", "-o", str(output), "--max-tier", "solve_hidden_singles",
+                     "--profile"]) == 0
+        rows = list(csv.DictReader(io.StringIO(output.read_text())))
+        assert [row["solved"] for row in rows] == ["1", "0", "0"]
+        _, err = capsys.readouterr()
+        assert "solve_hidden_singles" in err and "x_wing" not in err
+
+    def test_fallback(self, tmp_path, capsys):
+        path = tmp_path / "evil.txt"
+        path.write_text(cells_to_string(sudoku_evil().cells) + "\n")
+        assert main([str(path), "--fallback", "dlx", "-q"]) == 0
+        assert "0" not in capsys.readouterr().out
+
+    def test_errors(self, tmp_path, capsys):
+        path = tmp_path / "bad.txt"
+        path.write_text("123\n")
+        assert main([str(path)]) == 2
+        assert "bad.txt:1" in capsys.readouterr().err
+        assert main([str(path), "-t", "nope"]) == 2
+        assert main([str(tmp_path / "missing.txt")]) == 2
+
+    def test_lazy_imports(self):
+        code = "import sys, src.cli; print(sorted(m for m in sys.modules if m.startswith('src')))"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        assert out.strip() == "['src', 'src.cli']"
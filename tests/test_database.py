@@ -0,0 +1,81 @@
+import pytest
+
+from src.boards.difficulty import sudoku_hard
+from src.cli import main
+from src.database import (GRID_SIZE, HEADER_SIZE, DatabaseWriter,
+                          PuzzleDatabase, convert_text, pack_grid, unpack_grid)
+from src.grader import Grader
+from src.sudoku import Sudoku
+from src.util import cells_to_string
+
+
+class TestDatabase:
+    def test_pack_grid(self):
+        cells = sudoku_hard().cells
+        packed = pack_grid(cells)
+        assert len(packed) == GRID_SIZE
+        assert packed[0] == cells[0] << 4 | cells[1]
+        assert unpack_grid(packed) == cells
+
+    def test_lookup(self, tmp_path, puzzles):
+        path = str(tmp_path / "puzzles.sudb")
+        with DatabaseWriter(path) as writer:
+            for cells in puzzles:
+                writer.add(cells)
+        assert (tmp_path / "puzzles.sudb").stat().st_size == HEADER_SIZE + 5 * GRID_SIZE
+        with PuzzleDatabase(path) as db:
+            assert len(db) == 5
+            assert db[3] == puzzles[3] and db[-1] == puzzles[4]
+            assert list(db) == puzzles
+            assert db.solution(0) is None and db.grade(0) is None
+            with pytest.raises(IndexError):
+                db[5]
+
+    def test_solutions_and_grades(self, tmp_path, puzzles):
+        path = str(tmp_path / "graded.sudb")
+        grader = Grader()
+        with DatabaseWriter(path, solutions=True, grades=True) as writer:
+            for cells in puzzles:
+                sudoku = Sudoku(list(cells))
+                sudoku.solve("dlx")
+                writer.add(cells, sudoku.cells, grader.grade(cells))
+            writer.add(puzzles[0])
+        with PuzzleDatabase(path) as db:
+            assert db.has_solutions and db.has_grades
+            assert list(db) == puzzles + [puzzles[0]]
+            record = db.record(4)
+            assert record.puzzle == puzzles[4] and 0 not in record.solution
+            assert not record.grade.solved and record.grade.tier == len(grader.techniques)
+            assert db.grade(0).solved and db.grade(0).tier == 0
+            # A puzzle added without its solution or grade
+            assert db.solution(5) == [0] * 81 and not db.grade(5).solved
+
+    def test_convert_text(self, tmp_path, puzzles):
+        text = tmp_path / "puzzles.txt"
+        text.write_text("\n".join(cells_to_string(cells) for cells in puzzles) + "\n")
+        path = str(tmp_path / "puzzles.sudb")
+        assert convert_text(str(text), path, solutions=True) == 5
+        with PuzzleDatabase(path) as db:
+            for k, sudoku in enumerate(db.sudokus()):
+                sudoku.solve("dlx")
+                assert sudoku.cells == db.solution(k)
+
+    def test_invalid(self, tmp_path, puzzles):
+        path = tmp_path / "bad.sudb"
+        path.write_bytes(b"not a database" * 4)
+        with pytest.raises(ValueError, match="not a puzzle database"):
+            PuzzleDatabase(str(path))
+        good = str(tmp_path / "good.sudb")
+        with DatabaseWriter(good) as writer:
+            writer.add(puzzles[0])
+        path.write_bytes(open(good, "rb").read()[:-1])
+        with pytest.raises(ValueError, match="truncated"):
+            PuzzleDatabase(str(path))
+
+    def test_cli(self, tmp_path, capsys, puzzles):
+        path = str(tmp_path / "puzzles.sudb")
+        with DatabaseWriter(path) as writer:
+            for cells in puzzles[:3]:
+                writer.add(cells)
+        assert main([path, "-q"]) == 0
+        assert len(capsys.readouterr().out.splitlines()) == 3
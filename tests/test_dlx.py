@@ -0,0 +1,36 @@
+import pytest
+
+from src.boards.difficulty import *
+from src.dlx import solve_exact_cover
+from src.sudoku import Sudoku
+
+
+class TestDLX:
+    def test_fallback_evil(self):
+        for sudoku in (sudoku_evil(), sudoku_evil_2()):
+            cells_solved = sudoku.solve(fallback="dlx")
+            assert sudoku.solved
+            assert sudoku.phases["logic"] + sudoku.phases["dlx"] == cells_solved
+
+    def test_fallback_not_needed(self):
+        sudoku = sudoku_easy()
+        sudoku.solve(fallback="dlx")
+        assert sudoku.solved
+        assert sudoku.phases["dlx"] == 0
+
+    def test_unknown_fallback(self):
+        with pytest.raises(ValueError):
+            sudoku_easy().solve(fallback="guess")
+
+    def test_no_solution(self):
+        cells = [0] * 81
+        cells[:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+        cells[9 * 4 + 8] = 9
+        sudoku = Sudoku(cells)
+        sudoku.compute_candidates()
+        assert solve_exact_cover(sudoku.cells, sudoku.candidates.masks) is None
+
+    def test_blank(self):
+        sudoku = Sudoku()
+        sudoku.solve(fallback="dlx")
+        assert sudoku.solved
@@ -0,0 +1,86 @@
+from src.boards.difficulty import *
+from src.boards.technique import *
+from src.candidates import Candidates
+from src.fish import find_fish, line_index
+
+
+def lines_of(*rows):
+    '''
+        Lines of a digit from the columns of each row, as strings of 9 characters ("x" for a candidate).
+    '''
+    return [sum(1 << c for c, ch in enumerate(row) if ch == "x") for row in rows]
+
+
+class TestFish:
+    def test_line_index(self):
+        masks = [0] * 81
+        masks[10] = 0b101
+        index = line_index(masks)
+        assert index.rows[1][1] == 1 << 1
+        assert index.columns[3][1] == 1 << 1
+        assert index.rows[2] == [0] * 9
+
+    def test_x_wing(self):
+        lines = lines_of(
+            "x...x....",
+            "x.x.x....",
+            ".........",
+            "x...x....",
+            ".........", ".........", ".........", ".........", "....x...x",
+        )
+        fish = list(find_fish(lines, 2))
+        assert [(f.base, f.targets) for f in fish] == [((0, 3), ((1, 0), (1, 4), (8, 4)))]
+        assert list(find_fish(lines, 2, dirty=[False] * 9)) == []
+
+    def test_finned_x_wing(self):
+        # Rows 0 and 4 cover columns 1 and 6, with a fin in column 8 of row 4, in box 5
+        lines = lines_of(
+            ".x....x..",
+            ".........",
+            ".........",
+            "......x.x",
+            ".x....x.x",
+            "......x..",
+            "......x..",
+            ".........",
+            ".........",
+        )
+        assert list(find_fish(lines, 2)) == []
+        targets = [f.targets for f in find_fish(lines, 2, finned=True)]
+        # Only the cover column inside the box of the fin
+        assert ((3, 6), (5, 6)) in targets
+        assert all((6, 6) not in t for t in targets)
+
+    def test_sashimi_x_wing(self):
+        # Row 4 only has column 6 left in the cover, and fins in columns 7 and 8 of box 5
+        lines = lines_of(
+            ".x....x..",
+            ".x.......",
+            ".........",
+            "......x..",
+            "......xxx",
+            "......x..",
+            ".........",
+            ".........",
+            ".........",
+        )
+        targets = [f.targets for f in find_fish(lines, 2, finned=True)]
+        assert ((3, 6), (5, 6)) in targets
+
+    def test_cached_index(self):
+        candidates = Candidates()
+        candidates.set_mask(0, 0b11)
+        first = candidates.cached("line_index", line_index)
+        assert candidates.cached("line_index", line_index) is first
+        candidates.eliminate((0,), 0b1)
+        assert candidates.cached("line_index", line_index) is not first
+
+    def test_boards(self):
+        for sudoku in (sudoku_x_wing(), sudoku_swordfish(), sudoku_jellyfish()):
+            sudoku.solve()
+            assert sudoku.solved
+
+    def test_evil(self):
+        sudoku = sudoku_evil()
+        sudoku.solve()
+        assert sudoku.techniques_used.get("finned_x_wing", 0) > 0
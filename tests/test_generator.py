@@ -0,0 +1,41 @@
+from src.generator import Generator, generate_parallel, generate_puzzles
+from src.scheduler import TECHNIQUES
+from src.search import count_solutions
+from src.util import parse_cells
+
+
+class TestGenerator:
+    def test_unique(self):
+        generated = Generator(1).generate()
+        puzzle = parse_cells(generated.puzzle)
+        solution = []
+        assert count_solutions(puzzle, solution=solution) == 1
+        assert solution == parse_cells(generated.solution)
+
+    def test_minimal(self):
+        puzzle = parse_cells(Generator(2).generate().puzzle)
+        for i in range(81):
+            if puzzle[i]:
+                removed = list(puzzle)
+                removed[i] = 0
+                assert count_solutions(removed) == 2
+
+    def test_seed(self):
+        assert list(generate_puzzles(3, seed=5)) == list(generate_puzzles(3, seed=5))
+        assert list(generate_puzzles(3, seed=5)) != list(generate_puzzles(3, seed=6))
+
+    def test_tiers(self):
+        generated = Generator(3).generate("pointing_pair", "x_wing")
+        assert generated.grade.solved
+        assert TECHNIQUES.index("pointing_pair") <= generated.grade.tier <= TECHNIQUES.index("x_wing")
+
+        easy = Generator(3).generate(max_tier=0)
+        assert easy.grade.hardest == "solve_hidden_singles"
+
+    def test_attempts(self):
+        assert Generator(4).generate(min_tier="jellyfish", max_tier="jellyfish", attempts=1) is None
+
+    def test_parallel(self):
+        puzzles = list(generate_parallel(4, seed=9, jobs=2, chunk_size=1))
+        assert len(puzzles) == 4
+        assert puzzles == list(generate_parallel(4, seed=9, jobs=1, chunk_size=1))
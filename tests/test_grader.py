@@ -0,0 +1,49 @@
+import pytest
+
+from src.boards.difficulty import *
+from src.boards.technique import *
+from src.grader import Grader, grade_file, grade_many
+from src.scheduler import TECHNIQUES
+from src.util import cells_to_string
+
+
+class TestGrader:
+    def test_grade(self):
+        grade = Grader().grade(sudoku_expert().cells)
+        assert grade.solved
+        assert grade.hardest == "naked_subsets"
+        assert grade.tier == TECHNIQUES.index("naked_subsets")
+        assert grade.steps["solve_hidden_singles"] == 59
+        assert grade.score > Grader().grade(sudoku_easy().cells).score
+
+    def test_hardest(self):
+        grader = Grader()
+        assert grader.grade(sudoku_easy().cells).hardest == "solve_hidden_singles"
+        assert grader.grade(sudoku_x_wing().cells).hardest == "x_wing"
+        assert grader.grade(sudoku_jellyfish().cells).hardest == "jellyfish"
+
+    def test_unsolved(self):
+        grade = Grader().grade(sudoku_evil().cells)
+        assert not grade.solved
+        assert grade.hardest is None
+        assert grade.tier == len(TECHNIQUES)
+
+    def test_max_tier(self):
+        grader = Grader()
+        grade = grader.grade(sudoku_x_wing().cells, "pointing_pair")
+        assert not grade.solved
+        assert grade.tier == 2
+        assert grader.grade(sudoku_hard().cells, "pointing_pair") == grader.grade(sudoku_hard().cells)
+        with pytest.raises(ValueError):
+            grader.grade(sudoku_hard().cells, "guessing")
+
+    def test_grade_many(self):
+        puzzles = [sudoku_easy().cells, sudoku_expert().cells, sudoku_easy().cells]
+        grades = list(grade_many(puzzles))
+        assert [g.hardest for g in grades] == ["solve_hidden_singles", "naked_subsets", "solve_hidden_singles"]
+
+    def test_grade_file(self, tmp_path):
+        path = tmp_path / "puzzles.txt"
+        path.write_text(cells_to_string(sudoku_easy().cells) + "\n\n" + cells_to_string(sudoku_hard().cells) + "\n")
+        grades = list(grade_file(str(path)))
+        assert [(line_no, g.hardest) for line_no, g in grades] == [(1, "solve_hidden_singles"), (3, "pointing_pair")]
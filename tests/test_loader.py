@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from src.boards.difficulty import sudoku_expert
+from src.loader import iter_puzzles, load_puzzles, read_puzzles
+from src.sudoku import Sudoku
+from src.util import cells_to_string
+
+EXPERT = cells_to_string(sudoku_expert().cells).replace("0", ".")
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "puzzles.txt"
+    path.write_text(text)
+    return str(path)
+
+
+class TestLoader:
+    def test_one_line(self, tmp_path):
+        path = write(tmp_path, f"# corpus\n{EXPERT}\n\n{EXPERT.replace('.', '0')}  # same\n")
+        puzzles = list(iter_puzzles(path))
+        assert [line_no for line_no, _ in puzzles] == [2, 4]
+        assert puzzles[0][1] == puzzles[1][1]
+        assert puzzles[0][1][:9] == [6, 0, 0, 0, 0, 0, 0, 5, 0]
+
+    def test_grid(self, tmp_path):
+        grid = "\n".join(" ".join(EXPERT[r * 9:r * 9 + 9]) for r in range(9))
+        path = write(tmp_path, f"{EXPERT}\n{grid}\n")
+        puzzles = list(load_puzzles(path))
+        assert len(puzzles) == 2
+        assert puzzles[0] == puzzles[1]
+        assert Sudoku.from_file("sudoku.txt").cells[:9] == [0, 0, 0, 0, 0, 0, 0, 9, 0]
+
+    def test_stream(self):
+        assert [line_no for line_no, _ in read_puzzles(io.BytesIO(f"{EXPERT}\n{EXPERT}".encode()))] == [1, 2]
+
+    def test_empty(self, tmp_path):
+        assert list(iter_puzzles(write(tmp_path, ""))) == []
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(ValueError, match=":2:"):
+            list(iter_puzzles(write(tmp_path, f"{EXPERT}\n{EXPERT[:80]}x\n")))
+        with pytest.raises(ValueError, match=":1:"):
+            list(iter_puzzles(write(tmp_path, "12345\n")))
+        with pytest.raises(ValueError, match="incomplete"):
+            list(iter_puzzles(write(tmp_path, "123456789\n")))
@@ -0,0 +1,77 @@
+from src.boards.difficulty import *
+from src.search import count_solutions
+from src.sudoku import Sudoku
+
+
+def rebuilt(sudoku: Sudoku) -> Sudoku:
+    return Sudoku(list(sudoku.cells))
+
+
+class TestOccupancy:
+    def test_counts(self):
+        sudoku = sudoku_expert()
+        assert sudoku.filled == 81 - sudoku.cells.count(0)
+        assert sudoku.conflicts == 0
+        assert sudoku.occupied[0] == 0b000110000  # 5 and 6 in the first row
+
+    def test_place_cell(self):
+        sudoku = sudoku_expert()
+        sudoku.solve()
+        assert sudoku.solved
+        assert sudoku.filled == 81
+        assert sudoku.occupied == rebuilt(sudoku).occupied == [0x1FF] * 27
+
+    def test_conflicts(self):
+        sudoku = Sudoku()
+        sudoku.place_cell(0, 1)
+        sudoku.place_cell(1, 1)
+        # Twice in the first row and the first box
+        assert not sudoku.valid
+        assert sudoku.conflicts == 2
+        # Twice in the second column, and a third time in the first box
+        sudoku.place_cell(10, 1)
+        assert sudoku.conflicts == 3
+        sudoku.unset_cell(0, 0)
+        assert sudoku.conflicts == 2
+        sudoku.unset_cell(1, 1)
+        assert sudoku.valid
+        assert sudoku.filled == 1
+
+    def test_unset_cell(self):
+        sudoku = sudoku_hard()
+        sudoku.compute_candidates()
+        i = sudoku.cells.index(0)
+        digit = min(sudoku.candidates[i])
+        sudoku.place_cell(i, digit)
+        r, c = divmod(i, 9)
+        sudoku.unset_cell(r, c)
+        assert sudoku.cells == sudoku_hard().cells
+        assert digit in sudoku.candidates[i]
+        fresh = sudoku_hard()
+        fresh.compute_candidates()
+        assert list(sudoku.candidates.masks) == list(fresh.candidates.masks)
+
+    def test_unset_given_after_solve(self):
+        # The techniques eliminated candidates far from the cell because of its digit, which are possible again
+        sudoku = sudoku_evil()
+        sudoku.solve()
+        sudoku.unset_cell(1, 4)
+        assert not sudoku.is_unique()
+        assert sudoku.count_solutions(3) == count_solutions(sudoku.cells, limit=3) == 3
+
+    def test_rollback(self):
+        sudoku = sudoku_expert()
+        checkpoint = sudoku.checkpoint()
+        sudoku.solve()
+        sudoku.rollback(checkpoint)
+        expected = rebuilt(sudoku)
+        assert sudoku.filled == expected.filled
+        assert sudoku.occupied == expected.occupied
+        assert sudoku.digit_counts == expected.digit_counts
+
+    def test_reset(self):
+        sudoku = sudoku_expert()
+        sudoku.solve()
+        sudoku.reset(sudoku_easy().cells)
+        assert sudoku.occupied == sudoku_easy().occupied
+        assert sudoku.filled == 81 - sudoku_easy().cells.count(0)
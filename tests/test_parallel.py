@@ -0,0 +1,35 @@
+import inspect
+
+from src.batch import solve_many
+from src.boards import difficulty, technique
+from src.parallel import solve_parallel
+
+
+def all_puzzles():
+    boards = [f for m in (difficulty, technique) for name, f in inspect.getmembers(m, inspect.isfunction) if name.startswith("sudoku_")]
+    return [f().cells for f in boards]
+
+
+class TestParallel:
+    def test_ordered(self):
+        puzzles = all_puzzles()
+        expected = [result.solution for result in solve_many(puzzles)]
+        assert [result.solution for result in solve_parallel(puzzles, jobs=2, chunk_size=3)] == expected
+
+    def test_unordered(self):
+        puzzles = all_puzzles()
+        expected = [result.solution for result in solve_many(puzzles, fallback="dlx")]
+        results = list(solve_parallel(puzzles, jobs=2, chunk_size=2, ordered=False, fallback="dlx"))
+        assert sorted(result.solution for result in results) == sorted(expected)
+        assert all(result.solved for result in results)
+
+    def test_shared_memory(self):
+        puzzles = all_puzzles()
+        expected = list(solve_many(puzzles))
+        results = list(solve_parallel(puzzles, jobs=2, chunk_size=4, shared=True))
+        assert [result.solution for result in results] == [result.solution for result in expected]
+        assert [result.solved for result in results] == [result.solved for result in expected]
+
+    def test_empty(self):
+        assert list(solve_parallel([], jobs=2)) == []
+        assert list(solve_parallel([], jobs=2, shared=True)) == []
@@ -0,0 +1,42 @@
+from src.batch import solve_many
+from src.boards.difficulty import *
+from src.parallel import solve_parallel
+from src.profiling import TechniqueStats, percentiles
+
+
+class TestProfiling:
+    def test_percentiles(self):
+        assert percentiles([3, 1, 2, 4]) == {"p50": 2, "p90": 4, "p99": 4}
+        assert percentiles([5.0], (90,)) == {"p90": 5.0}
+        assert percentiles([1, 2], (50,)) == {"p50": 1}
+        assert percentiles(range(1, 11)) == {"p50": 5, "p90": 9, "p99": 10}
+        assert percentiles(range(1, 101)) == {"p50": 50, "p90": 90, "p99": 99}
+        assert percentiles([]) == {"p50": None, "p90": None, "p99": None}
+
+    def test_sudoku_stats(self):
+        sudoku = sudoku_expert()
+        sudoku.stats = TechniqueStats()
+        sudoku.solve()
+        stats = sudoku.stats.as_dict()
+        assert stats["solve_hidden_singles"]["placed"] == 59
+        assert stats["pointing_pair"]["calls"] >= 1
+        assert all(s["noops"] <= s["calls"] for s in stats.values())
+        assert all(s["time"] >= 0 for s in stats.values())
+
+    def test_disabled(self):
+        sudoku = sudoku_expert()
+        sudoku.solve()
+        assert sudoku.stats is None
+
+    def test_aggregate(self):
+        puzzles = [sudoku_easy().cells, sudoku_expert().cells]
+        stats = TechniqueStats()
+        list(solve_many(puzzles, stats=stats))
+        assert stats.as_dict()["solve_hidden_singles"]["placed"] == 43 + 59
+
+        parallel_stats = TechniqueStats()
+        list(solve_parallel(puzzles, jobs=2, chunk_size=1, stats=parallel_stats))
+        assert parallel_stats.as_dict()["solve_hidden_singles"]["placed"] == 43 + 59
+
+        total = TechniqueStats.aggregate([stats, parallel_stats])
+        assert total.as_dict()["solve_hidden_singles"]["calls"] == 2 * stats.as_dict()["solve_hidden_singles"]["calls"]
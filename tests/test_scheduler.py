@@ -0,0 +1,22 @@
+from src.boards.difficulty import sudoku_easy, sudoku_expert
+from src.scheduler import Scheduler
+
+
+class TestScheduler:
+    def test_progress(self):
+        sudoku = sudoku_expert()
+        sudoku.solve()
+        assert sudoku.solved
+        assert sudoku.techniques_used['solve_hidden_singles'] == 59
+
+    def test_custom_techniques(self):
+        sudoku = sudoku_expert()
+        sudoku.scheduler = Scheduler(['solve_hidden_singles'])
+        sudoku.solve()
+        assert not sudoku.solved
+        assert list(sudoku.techniques_used) == ['solve_hidden_singles']
+
+    def test_fixpoint(self):
+        sudoku = sudoku_easy()
+        sudoku.solve()
+        assert Scheduler().run(sudoku) == {}
@@ -0,0 +1,127 @@
+from itertools import product
+from random import Random
+
+from src.boards.difficulty import *
+from src.search import count_solutions, has_other_solution, propagate
+from src.sudoku import Sudoku
+
+
+class TestSearch:
+    def test_unique(self):
+        for sudoku in (sudoku_easy(), sudoku_expert(), sudoku_evil()):
+            assert count_solutions(sudoku.cells) == 1
+
+    def test_solution(self):
+        sudoku = sudoku_evil()
+        solution = []
+        assert count_solutions(sudoku.cells, solution=solution) == 1
+        assert 0 not in solution
+        assert all(solution[i] == v for i, v in enumerate(sudoku.cells) if v)
+
+    def test_limit(self):
+        assert count_solutions([0] * 81) == 2
+        assert count_solutions([0] * 81, limit=5) == 5
+
+    def test_no_solution(self):
+        cells = [0] * 81
+        cells[0] = cells[1] = 1
+        assert count_solutions(cells) == 0
+
+    def test_propagate(self):
+        # Singles alone solve the easy board
+        cells = sudoku_easy().cells
+        solution = []
+        count_solutions(cells, solution=solution)
+        # Placing the givens on an empty grid
+        pending = [(i, 1 << (v - 1)) for i, v in enumerate(cells) if v]
+        grid = [0] * 81
+        assert propagate(grid, [0x1FF] * 81, pending)
+        assert grid == solution
+        # 1 has no place left in the first row
+        candidates = [0x1FF] * 81
+        for i in range(9):
+            candidates[i] = 0x1FE
+        assert not propagate([0] * 81, candidates, [])
+
+    def test_masks(self):
+        cells = sudoku_easy().cells
+        solution = []
+        count_solutions(cells, solution=solution)
+        masks = [0x1FF] * 81
+        i = cells.index(0)
+        masks[i] = 0x1FF & ~(1 << (solution[i] - 1))
+        assert count_solutions(cells, masks) == 0
+
+    def test_random(self):
+        grid, same = [], []
+        count_solutions([0] * 81, limit=1, solution=grid, rng=Random(7))
+        count_solutions([0] * 81, limit=1, solution=same, rng=Random(7))
+        assert grid == same
+        assert count_solutions(grid) == 1
+
+    def test_has_other_solution(self):
+        solution = []
+        count_solutions(sudoku_easy().cells, solution=solution)
+        assert not has_other_solution(solution, 0)
+        assert has_other_solution([0] * 80 + [1], 80)
+
+
+class TestSudokuSolutions:
+    def test_count(self):
+        assert sudoku_expert().count_solutions() == 1
+        assert sudoku_expert().is_unique()
+        assert Sudoku().count_solutions(limit=3) == 3
+        assert not Sudoku().is_unique()
+
+    def test_no_solution(self):
+        cells = [0] * 81
+        cells[0] = cells[8] = 1
+        assert Sudoku(cells).count_solutions() == 0
+
+    def test_propagated(self):
+        sudoku = sudoku_evil()
+        sudoku.solve()
+        cells = list(sudoku.cells)
+        masks = list(sudoku.candidates.masks)
+        assert sudoku.is_unique()
+        assert sudoku.cells == cells
+        assert list(sudoku.candidates.masks) == masks
+
+    def test_stale_candidates(self):
+        # The candidates left by the previous puzzle are not those of the new cells
+        sudoku = sudoku_evil()
+        sudoku.solve()
+        sudoku.set_cells(sudoku_easy().cells)
+        assert sudoku.count_solutions() == 1
+        assert sudoku.is_unique()
+        sudoku.solve()
+        sudoku.reset(sudoku_medium().cells)
+        assert sudoku.is_unique()
+
+    def test_partial_candidates(self):
+        sudoku = sudoku_easy()
+        sudoku.compute_candidates(sudoku.cells.index(0))
+        assert sudoku.count_solutions() == 1
+        assert sudoku.is_unique()
+
+    def test_rolled_back_candidates(self):
+        sudoku = sudoku_easy()
+        checkpoint = sudoku.checkpoint()
+        sudoku.compute_candidates()
+        sudoku.rollback(checkpoint)
+        assert sudoku.is_unique()
+
+    def test_not_unique(self):
+        # Empty a rectangle of 2 digits over 2 boxes from a solution: the digits can be swapped
+        solution = []
+        count_solutions(sudoku_easy().cells, solution=solution)
+        for r1, r2, c1, c2 in product(range(9), range(9), range(9), range(9)):
+            if r1 < r2 and r1 // 3 == r2 // 3 and c1 < c2 and c1 // 3 != c2 // 3:
+                a, b = solution[r1 * 9 + c1], solution[r1 * 9 + c2]
+                if solution[r2 * 9 + c1] == b and solution[r2 * 9 + c2] == a:
+                    break
+        for i in (r1 * 9 + c1, r1 * 9 + c2, r2 * 9 + c1, r2 * 9 + c2):
+            solution[i] = 0
+        sudoku = Sudoku(solution)
+        assert sudoku.count_solutions(limit=10) == 2
+        assert not sudoku.is_unique()
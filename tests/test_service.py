@@ -0,0 +1,136 @@
+import asyncio
+import json
+from concurrent.futures import Executor, Future
+
+import pytest
+
+from src.batch import solve_many
+from src.client import ServiceError, SolveClient, load_test
+from src.service import SolveServer
+from src.util import cells_to_string
+
+
+def run(test):
+    '''
+        Run test(server, connect) against a server with 2 workers on a free TCP port.
+    '''
+    async def main():
+        async with SolveServer(jobs=2, queue_size=4) as server:
+            await server.start('127.0.0.1', 0)
+            host, port = server.address[:2]
+            return await test(server, lambda: SolveClient.connect(host, port))
+    return asyncio.run(main())
+
+
+class TestService:
+    def test_solve(self, puzzles):
+        async def test(server, connect):
+            async with await connect() as client:
+                answers = await asyncio.gather(*(client.solve(puzzle) for puzzle in puzzles))
+                stats = await client.stats()
+            return answers, stats
+
+        answers, stats = run(test)
+        expected = solve_many(puzzles)
+        assert [(answer['solution'], answer['solved']) for answer in answers] == [(r.solution, r.solved) for r in expected]
+        assert stats['completed'] == len(answers) and stats['received'] == len(answers)
+        assert stats['queue_depth'] == 0 and stats['latency']['p50'] is not None
+
+    def test_errors(self, puzzles):
+        async def test(server, connect):
+            async with await connect() as client:
+                with pytest.raises(ServiceError, match='81 digits'):
+                    await client.call({'puzzle': '123'})
+                with pytest.raises(ServiceError, match='unknown'):
+                    await client.call({'type': 'reboot'})
+                client.writer.write(b'not json\n')
+                await client.writer.drain()
+                # The answer to a malformed line has no id, so it goes nowhere and the connection stays usable
+                return (await client.solve(puzzles[0]))['solved']
+
+        assert run(test)
+
+    def test_timeout(self, puzzles):
+        async def test(server, connect):
+            async with await connect() as client:
+                with pytest.raises(ServiceError, match='timeout'):
+                    await client.solve(puzzles[0], timeout=0)
+                return await client.stats()
+
+        assert run(test)['timeouts'] == 1
+
+    def test_queued_timeout(self, puzzles):
+        async def test(server, connect):
+            # Without dispatchers the request stays queued, and is still answered at its deadline
+            dispatchers = server.dispatchers
+            for task in dispatchers:
+                task.cancel()
+            await asyncio.gather(*dispatchers, return_exceptions=True)
+            async with await connect() as client:
+                with pytest.raises(ServiceError, match='timeout'):
+                    await asyncio.wait_for(client.solve(puzzles[0], timeout=0.05), 5)
+                server.dispatchers = [asyncio.create_task(server.dispatch())]
+                await server.queue.join()
+                return await client.stats()
+
+        stats = run(test)
+        assert stats['timeouts'] == 1 and stats['completed'] == 0 and stats['queue_depth'] == 0
+
+    def test_worker_failure(self, puzzles):
+        class FailingExecutor(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(RuntimeError('worker crashed'))
+                return future
+
+        async def test(server, connect):
+            pool, server.executor = server.executor, FailingExecutor()
+            try:
+                async with await connect() as client:
+                    with pytest.raises(ServiceError, match='worker crashed'):
+                        await asyncio.wait_for(client.solve(puzzles[0]), 5)
+                    # The dispatchers survive the failure
+                    with pytest.raises(ServiceError, match='worker crashed'):
+                        await asyncio.wait_for(client.solve(puzzles[1]), 5)
+                    server.executor = pool
+                    return await client.solve(puzzles[2])
+            finally:
+                server.executor = pool
+
+        assert run(test)['solved']
+
+    def test_raw_lines(self, puzzles):
+        async def test(server, connect):
+            host, port = server.address[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            for k, puzzle in enumerate(puzzles):
+                writer.write(json.dumps({'id': k, 'puzzle': cells_to_string(puzzle)}).encode() + b'\n')
+            writer.write_eof()
+            # The server answers every request before closing the connection
+            answers = [json.loads(line) async for line in reader]
+            writer.close()
+            return answers
+
+        answers = run(test)
+        assert sorted(answer['id'] for answer in answers) == list(range(len(puzzles)))
+
+    def test_load(self, puzzles):
+        async def test(server, connect):
+            host, port = server.address[:2]
+            return await load_test(puzzles * 4, host, port, concurrency=8, connections=2)
+
+        report = run(test)
+        # The techniques alone do not solve the last board
+        assert report.requests == 20 and report.solved == 16 and report.errors == 0
+        assert report.server['completed'] == 20
+
+    def test_unix_socket(self, tmp_path, puzzles):
+        path = str(tmp_path / 'solver.sock')
+
+        async def main():
+            async with SolveServer(jobs=1) as server:
+                await server.start(path=path)
+                async with await SolveClient.connect(path=path) as client:
+                    return await client.solve(puzzles[0])
+
+        assert asyncio.run(main())['solved']
@@ -0,0 +1,45 @@
+from src.candidates import ALL_CANDIDATES, digits_mask
+from src.subsets import find_hidden_subsets, find_naked_subsets, locked_sets
+from src.topology import ROWS
+
+
+def row_masks(*cells):
+    masks = [0] * 81
+    for i, digits in enumerate(cells):
+        masks[i] = digits_mask(digits)
+    return masks
+
+
+class TestSubsets:
+    def test_locked_sets(self):
+        bits = [0b011, 0b110, 0b011, 0b1000]
+        assert list(locked_sets(bits, 4)) == [(0b111, (0, 1, 2)), (0b011, (0, 2))]
+        assert list(locked_sets(bits, 2)) == [(0b011, (0, 2))]
+        assert [members for _, members in locked_sets([0b0011, 0b0110, 0b1100, 0b1001], 4)] == [(0, 1, 2, 3)]
+        assert list(locked_sets([0b0011, 0b0110, 0b1100, 0b1001], 3)) == []
+
+    def test_naked_pair(self):
+        masks = row_masks((1, 2), (1, 2), (1, 2, 3), (3, 4, 5))
+        assert find_naked_subsets(masks, ROWS[0]) == [((2,), digits_mask((1, 2)), (0, 1))]
+
+    def test_naked_quad(self):
+        masks = row_masks((1, 2), (2, 3), (3, 4), (1, 4), (1, 5, 6), (5, 6, 7))
+        eliminations = find_naked_subsets(masks, ROWS[0])
+        assert eliminations == [((4,), digits_mask((1, 2, 3, 4)), (0, 1, 2, 3))]
+        assert find_naked_subsets(masks, ROWS[0], max_size=3) == []
+
+    def test_hidden_quad(self):
+        # 1, 2, 3 and 4 are only candidates of the first four cells
+        masks = row_masks((1, 2, 8), (2, 3, 9), (3, 4), (1, 4, 8, 9), (5, 6, 8), (6, 7, 9), (5, 7, 8), (5, 6, 7, 9))
+        eliminations = find_hidden_subsets(masks, ROWS[0])
+        assert eliminations == [((0, 1, 3), ALL_CANDIDATES & ~digits_mask((1, 2, 3, 4)), (0, 1, 2, 3))]
+
+    def test_hidden_pair(self):
+        masks = row_masks((1, 2, 3), (1, 2, 4), (3, 4, 5), (3, 4, 5))
+        assert find_hidden_subsets(masks, ROWS[0]) == [((0, 1), ALL_CANDIDATES & ~digits_mask((1, 2)), (0, 1))]
+
+    def test_whole_unit(self):
+        # The naked set of all the empty cells of a unit removes nothing
+        masks = row_masks((1, 2), (1, 2))
+        assert find_naked_subsets(masks, ROWS[0]) == []
+        assert find_hidden_subsets(masks, ROWS[0]) == []
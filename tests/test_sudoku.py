@@ -50,6 +50,15 @@ class TestSudoku:
         blank_sudoku = Sudoku()
         assert blank_sudoku.compute_candidates(0) == {1, 2, 3, 4, 5, 6, 7, 8, 9}
 
+    def test_eliminate_candidates(self):
+        sudoku = Sudoku()
+        sudoku.compute_candidates()
+        # The row, the column and the box of cell 10, which includes the cell itself
+        assert sudoku.eliminate_candidates(5, i=10) == 21
+        assert 5 not in sudoku.candidates[10]
+        assert 5 not in sudoku.candidates[0] and 5 not in sudoku.candidates[73]
+        assert 5 in sudoku.candidates[80]
+
     def test_valid(self, sudoku: Sudoku):
         assert sudoku.valid
 
@@ -0,0 +1,25 @@
+from src.topology import *
+
+
+class TestTopology:
+    def test_units(self):
+        assert len(UNITS) == 27
+        assert all(len(unit) == 9 for unit in UNITS)
+        assert BOXES[4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+        assert CELL_UNITS[40] == (4, 13, 22)
+
+    def test_peers(self):
+        assert all(len(peers) == 20 for peers in PEERS)
+        assert 0 not in PEER_SETS[0]
+        assert {1, 9, 10, 72} <= PEER_SETS[0]
+        assert 40 not in PEER_SETS[0]
+
+    def test_mini_lines(self):
+        assert MINI_ROWS[4][1] == (39, 40, 41)
+        assert MINI_COLUMNS[4][1] == (31, 40, 49)
+        assert MINI_ROW_REST_OF_LINE[4][1] == (36, 37, 38, 42, 43, 44)
+        assert MINI_COLUMN_REST_OF_BOX[4][1] == (30, 32, 39, 41, 48, 50)
+
+    def test_positions(self):
+        assert POSITIONS[28] == (3, 1, 3)
+        assert POSITIONS[80] == (8, 8, 8)
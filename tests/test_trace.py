@@ -0,0 +1,61 @@
+import pytest
+
+from src.boards.difficulty import *
+from src.sudoku import Sudoku
+from src.trace import ELIMINATE, PLACE, Trace
+
+
+class TestTrace:
+    def test_events(self):
+        sudoku = sudoku_expert()
+        sudoku.trace = Trace()
+        sudoku.solve()
+        events = sudoku.trace.events()
+        placements = [e for e in events if e.kind == PLACE]
+        assert len(placements) == 59
+        assert all(e.technique == "solve_hidden_singles" for e in placements)
+        assert all(len(e.reasons) == 9 for e in placements)
+        assert any(e.kind == ELIMINATE for e in events)
+        assert all(e.technique for e in events)
+
+    def test_disabled(self):
+        sudoku = sudoku_expert()
+        sudoku.solve()
+        assert sudoku.trace is None
+
+    def test_replay(self):
+        sudoku = sudoku_evil()
+        sudoku.trace = Trace()
+        sudoku.solve()
+        replayed = Sudoku.from_trace(sudoku.trace)
+        assert replayed.cells == sudoku.cells
+        assert replayed.candidates.masks == sudoku.candidates.masks
+
+    def test_replay_steps(self):
+        start = sudoku_expert().cells
+        sudoku = sudoku_expert()
+        sudoku.trace = Trace()
+        sudoku.solve()
+        assert Sudoku.from_trace(sudoku.trace, 0).cells == start
+        first = sudoku.trace.events()[0]
+        replayed = Sudoku.from_trace(sudoku.trace, 1)
+        if first.kind == PLACE:
+            assert replayed.cells[first.cell] == first.digits[0]
+        else:
+            assert not set(first.digits) & replayed.candidates[first.cell]
+
+    def test_dlx_fallback(self):
+        sudoku = sudoku_evil()
+        sudoku.trace = Trace()
+        sudoku.solve("dlx")
+        assert sudoku.trace.events()[-1].technique == "dlx"
+        assert Sudoku.from_trace(sudoku.trace).cells == sudoku.cells
+
+    def test_overflow(self):
+        sudoku = sudoku_expert()
+        sudoku.trace = Trace(capacity=8)
+        sudoku.solve()
+        assert len(sudoku.trace) == 8
+        assert sudoku.trace.dropped > 0
+        with pytest.raises(ValueError):
+            Sudoku.from_trace(sudoku.trace)
@@ -0,0 +1,76 @@
+import pytest
+
+from src.boards.difficulty import *
+from src.candidates import Candidates
+
+
+class TestTrail:
+    def test_rollback_solve(self):
+        sudoku = sudoku_expert()
+        sudoku.compute_candidates()
+        cells = list(sudoku.cells)
+        masks = list(sudoku.candidates.masks)
+        checkpoint = sudoku.checkpoint()
+        sudoku.solve()
+        assert sudoku.solved
+        sudoku.rollback(checkpoint)
+        assert sudoku.cells == cells
+        assert list(sudoku.candidates.masks) == masks
+
+    def test_nested(self):
+        sudoku = sudoku_hard()
+        sudoku.compute_candidates()
+        start = list(sudoku.cells)
+        outer = sudoku.checkpoint()
+        i = sudoku.cells.index(0)
+        sudoku.place_cell(i, min(sudoku.candidates[i]))
+        placed = list(sudoku.cells)
+        placed_masks = list(sudoku.candidates.masks)
+        inner = sudoku.checkpoint()
+        sudoku.solve_hidden_singles()
+        sudoku.pointing_pair()
+        sudoku.rollback(inner)
+        assert sudoku.cells == placed
+        assert list(sudoku.candidates.masks) == placed_masks
+        sudoku.rollback(outer)
+        assert sudoku.cells == start
+
+    def test_proportional(self):
+        sudoku = sudoku_expert()
+        sudoku.compute_candidates()
+        checkpoint = sudoku.checkpoint()
+        sudoku.pointing_pair()
+        assert len(sudoku.candidates.trail) - checkpoint.candidates <= 81
+        assert len(sudoku.trail) == checkpoint.cells
+
+    def test_dirty_units(self):
+        sudoku = sudoku_expert()
+        sudoku.compute_candidates()
+        checkpoint = sudoku.checkpoint()
+        eliminated = sudoku.pointing_pair()
+        assert eliminated > 0
+        while sudoku.pointing_pair():
+            pass
+        sudoku.rollback(checkpoint)
+        # The units touched by the rollback are scanned again
+        assert sudoku.pointing_pair() == eliminated
+
+    def test_release(self):
+        sudoku = sudoku_expert()
+        checkpoint = sudoku.checkpoint()
+        sudoku.release()
+        assert sudoku.trail is None
+        with pytest.raises(ValueError):
+            sudoku.rollback(checkpoint)
+        sudoku.checkpoint()
+        sudoku.reset(sudoku_easy().cells)
+        assert sudoku.trail is None and sudoku.candidates.trail is None
+
+    def test_candidates(self):
+        candidates = Candidates()
+        checkpoint = candidates.checkpoint()
+        candidates.set_mask(0, 0b111)
+        candidates.eliminate(range(81), 0b10)
+        assert candidates.masks[0] == 0b101
+        candidates.rollback(checkpoint)
+        assert candidates.masks[0] == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from src.batch import solve_many
+from src.boards.difficulty import *
+from src.sudoku import Sudoku
+from src.util import cells_to_string
+
+np = pytest.importorskip("numpy")
+
+from src import vectorized  # noqa: E402
+
+
+class TestVectorized:
+    def test_compute_candidates(self, puzzles):
+        grids = vectorized.to_grids(puzzles)
+        candidates = vectorized.compute_candidates(grids)
+        for grid, masks in zip(grids, candidates):
+            sudoku = Sudoku(grid.tolist())
+            sudoku.compute_candidates()
+            assert masks.tolist() == list(sudoku.candidates.masks)
+
+    def test_valid(self):
+        invalid = [0] * 81
+        invalid[0] = invalid[1] = 5
+        grids = vectorized.to_grids([sudoku_easy().cells, invalid, [0] * 81])
+        assert vectorized.valid(grids).tolist() == [True, False, True]
+
+    def test_propagate(self, puzzles):
+        grids = vectorized.to_grids(puzzles)
+        _, cells_solved = vectorized.propagate(grids)
+        assert cells_solved[0] == 43
+        assert not (grids[0] == 0).any()
+        assert vectorized.valid(grids).all()
+
+    def test_solve_bulk(self, puzzles):
+        expected = list(solve_many(puzzles))
+        results = vectorized.solve_bulk(puzzles)
+        assert [result.solution for result in results] == [result.solution for result in expected]
+        assert [result.solved for result in results] == [result.solved for result in expected]
+        assert results[0].techniques == {"vectorized_singles": 43}
+        assert vectorized.solve_bulk([]) == []
+
+    def test_solve_bulk_fallback(self):
+        result, = vectorized.solve_bulk([cells_to_string(sudoku_evil_2().cells)], fallback="dlx")
+        assert result.solved
@@ -0,0 +1,94 @@
+from src.boards.technique import *
+from src.candidates import DIGIT_MASKS, Candidates, digits_mask
+from src.wings import (find_w_wings, find_wxyz_wings, find_xyz_wings,
+                       find_y_wings, link_index, value_index)
+
+
+class TestWings:
+    def test_value_index(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[10] = digits_mask((1, 2, 3))
+        masks[80] = digits_mask((1, 2))
+        masks[40] = digits_mask((1, 2, 3, 4, 5))
+        index = value_index(masks)
+        assert index.by_count[2] == [0, 80]
+        assert index.by_count[3] == [10]
+        assert index.pairs == {digits_mask((1, 2)): [0, 80]}
+        # Row 0, column 0 and box 0
+        assert index.units[0] == [0] and index.units[9] == [0] and index.units[18] == [0, 10]
+        assert 40 not in index.units[4]
+
+    def test_link_index(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))
+        masks[5] = digits_mask((1, 3))
+        masks[8] = digits_mask((2, 3))
+        masks[9] = DIGIT_MASKS[3]
+        links = link_index(masks)
+        # Row 0 holds each digit twice, column 0 and box 0 hold 3 only in cell 9
+        assert links[1] == [(0, 5)]
+        assert links[2] == [(0, 8)]
+        assert (5, 8) in links[3] and (0, 9) not in links[3]
+
+    def test_y_wing(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))  # pivot at r0c0
+        masks[4] = digits_mask((1, 3))  # pincer at r0c4
+        masks[36] = digits_mask((2, 3))  # pincer at r4c0
+        masks[40] = digits_mask((3, 5))  # r4c4 sees both pincers
+        masks[44] = digits_mask((3, 5))  # r4c8 only sees one pincer
+        eliminations = find_y_wings(masks, value_index(masks))
+        assert eliminations == [((40,), DIGIT_MASKS[3], (0, 4, 36))]
+
+    def test_xyz_wing(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2, 3))  # pivot at r0c0
+        masks[4] = digits_mask((1, 3))  # pincer at r0c4
+        masks[10] = digits_mask((2, 3))  # pincer at r1c1
+        masks[1] = digits_mask((3, 5))  # r0c1 sees all three
+        masks[3] = digits_mask((3, 5))  # r0c3 does not see r1c1
+        eliminations = find_xyz_wings(masks, value_index(masks))
+        assert eliminations == [((1,), DIGIT_MASKS[3], (0, 4, 10))]
+
+    def test_w_wing(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2))  # r0c0
+        masks[44] = digits_mask((1, 2))  # r4c8
+        masks[4] = digits_mask((1, 6))  # r0c4 and r4c4 are the only places of 1 in column 4
+        masks[40] = digits_mask((1, 7))
+        masks[8] = digits_mask((2, 7))  # r0c8 and r4c0 see both bivalue cells
+        masks[36] = digits_mask((2, 5))
+        links = link_index(masks)
+        assert (4, 40) in links[1]
+        eliminations = find_w_wings(masks, value_index(masks), links)
+        assert eliminations == [((8, 36), DIGIT_MASKS[2], (0, 44, 4, 40))]
+        masks[22] = DIGIT_MASKS[1]  # r2c4 breaks the conjugate pair
+        assert find_w_wings(masks, value_index(masks), link_index(masks)) == []
+
+    def test_wxyz_wing(self):
+        masks = [0] * 81
+        masks[0] = digits_mask((1, 2, 3))  # hinge at r0c0
+        masks[1] = digits_mask((1, 4))  # r0c1
+        masks[5] = digits_mask((3, 4))  # r0c5
+        masks[10] = digits_mask((2, 4))  # r1c1 does not see r0c5: only 4 is unrestricted
+        masks[2] = digits_mask((4, 5))  # r0c2 sees the three cells holding 4
+        eliminations = find_wxyz_wings(masks, value_index(masks))
+        # r0c1 also sees the three other cells, so it finds the same wing as a hinge
+        assert ((2,), DIGIT_MASKS[4], (0, 1, 5, 10)) in eliminations
+        assert {(e.cells, e.mask) for e in eliminations} == {((2,), DIGIT_MASKS[4])}
+        masks[5] = digits_mask((3, 4, 6))
+        assert find_wxyz_wings(masks, value_index(masks)) == []
+
+    def test_cached_index(self):
+        candidates = Candidates()
+        candidates.set_mask(0, 0b11)
+        first = candidates.cached("value_index", value_index)
+        assert candidates.cached("value_index", value_index) is first
+        candidates.eliminate((0,), 0b1)
+        assert candidates.cached("value_index", value_index) is not first
+
+    def test_boards(self):
+        for sudoku in (sudoku_y_wing(), sudoku_xyz_wing()):
+            sudoku.solve()
+            assert sudoku.solved